@@ -0,0 +1,119 @@
+"""
+Implementation of subsets of an indexed group, as bitmasks
+"""
+
+from Set import Set
+from CayleyTable import CayleyTable
+
+def _mask(indices):
+    """Returns the bitmask with the bits of indices set"""
+    mask = 0
+    for i in indices:
+        mask |= 1 << i
+    return mask
+
+def _indices(mask):
+    """Returns the list of indices of the bits set in mask"""
+    return [i for i in xrange(mask.bit_length()) if mask >> i & 1]
+
+class BitSet(object):
+    """
+    Definition of a subset of the elements of a CayleyTable
+
+    The subset is a Python int, with bit i set if table.elems[i] is in it,
+    so unions, intersections, subset tests, equality and hashing are a few
+    word operations per 64 elements, rather than hashing every element.
+    BitSets can only be combined with BitSets of the same table.
+    """
+
+    __slots__ = ("table", "mask")
+
+    def __init__(self, table, mask=0):
+        if not isinstance(table, CayleyTable):
+            raise TypeError("table must be a CayleyTable")
+        if mask < 0 or mask >> len(table):
+            raise ValueError("mask must only have bits for elements of table")
+        self.table = table
+        self.mask = mask
+
+    @classmethod
+    def from_indices(cls, table, indices):
+        """Returns the BitSet of the elements of table with the given indices"""
+        return cls(table, _mask(indices))
+
+    def _other(self, other):
+        """Returns the mask of other, which must be a BitSet of self.table"""
+        if not isinstance(other, BitSet) or other.table is not self.table:
+            raise TypeError("BitSets must be subsets of the same table")
+        return other.mask
+
+    def __or__(self, other):
+        return BitSet(self.table, self.mask | self._other(other))
+
+    def __and__(self, other):
+        return BitSet(self.table, self.mask & self._other(other))
+
+    def __sub__(self, other):
+        return BitSet(self.table, self.mask & ~self._other(other))
+
+    def __xor__(self, other):
+        return BitSet(self.table, self.mask ^ self._other(other))
+
+    def __le__(self, other):
+        return self.mask & ~self._other(other) == 0
+
+    def __lt__(self, other):
+        return self <= other and self.mask != other.mask
+
+    def __ge__(self, other):
+        return self._other(other) & ~self.mask == 0
+
+    def __gt__(self, other):
+        return self >= other and self.mask != other.mask
+
+    def __eq__(self, other):
+        return isinstance(other, BitSet) and other.table is self.table and \
+               other.mask == self.mask
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.mask)
+
+    def __len__(self):
+        return bin(self.mask).count("1")
+
+    def __nonzero__(self):
+        return self.mask != 0
+
+    def __contains__(self, elem):
+        i = self.table.index.get(elem)
+        return i is not None and self.mask >> i & 1 == 1
+
+    def indices(self):
+        """Returns the list of indices of the elements of self"""
+        return _indices(self.mask)
+
+    def __iter__(self):
+        elems = self.table.elems
+        return (elems[i] for i in self.indices())
+
+    def to_set(self):
+        """Returns the elements of self as a Set"""
+        return Set(self)
+
+    def __repr__(self):
+        return "BitSet(%s)" % ", ".join(repr(x) for x in self)
+
+def bitset(table, elems):
+    """
+    Returns the BitSet of the elements elems of table
+
+    Raises ValueError if some element of elems isn't in table.
+    """
+    index = table.index
+    try:
+        return BitSet.from_indices(table, (index[x] for x in elems))
+    except KeyError:
+        raise ValueError("elems must be elements of table")
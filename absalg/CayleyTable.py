@@ -0,0 +1,114 @@
+"""
+Implementation of dense Cayley tables
+"""
+
+from array import array
+
+def _typecode(n):
+    """The smallest array typecode that holds the indices 0..n-1"""
+    if n <= 1 << 8:
+        return "B"
+    if n <= 1 << 16:
+        return "H"
+    return "l"
+
+class CayleyTable(object):
+    """
+    Definition of a Cayley table on the indices 0..n-1
+
+    elems[i] is the element numbered i, and the product of elems[i] and
+    elems[j] is elems[data[i * n + j]]. The table is one flat array of small
+    ints, so a product is a single lookup and the whole table takes n**2 small
+    ints rather than n**2 tuples. data can be any sequence of ints, such as
+    an array, or a ctypes array over a memory mapped file.
+    """
+
+    def __init__(self, elems, data):
+        """Record the numbering of elems, and check that data has the right size"""
+        self.elems = list(elems)
+        self.n = len(self.elems)
+        self.index = dict((g, i) for i, g in enumerate(self.elems))
+        if len(self.index) != self.n:
+            raise ValueError("elems must be distinct")
+        if len(data) != self.n ** 2:
+            raise ValueError("data must have one entry per pair of elements")
+        self.data = data
+        # A (function, args) pair that rebuilds the table, for pickling
+        # tables that are mapped from a file
+        self._source = None
+
+    def __reduce_ex__(self, protocol):
+        if self._source is not None:
+            return self._source
+        return object.__reduce_ex__(self, protocol)
+
+    def __len__(self):
+        return self.n
+
+    def mul(self, i, j):
+        """Returns the index of elems[i] * elems[j]"""
+        return self.data[i * self.n + j]
+
+    def row(self, i):
+        """Returns the indices of elems[i] * elems[j], for j = 0..n-1"""
+        return self.data[i * self.n:(i + 1) * self.n]
+
+    def renumber(self, order):
+        """
+        Returns the CayleyTable of the same product, with elems[order[i]]
+        numbered i
+        """
+        n = self.n
+        number = [0] * n
+        for i, j in enumerate(order):
+            number[j] = i
+        data = array(_typecode(n))
+        for a in order:
+            row = a * n
+            data.extend([number[self.data[row + b]] for b in order])
+        return CayleyTable([self.elems[j] for j in order], data)
+
+    def closure(self, gens):
+        """
+        Returns the list of indices of the subgroup generated by the indices
+        gens, starting with 0, which must be the identity
+
+        This is a breadth-first search along right multiplication by gens,
+        so it takes len(gens) lookups per element of the subgroup.
+        """
+        data, n = self.data, self.n
+        reached = [0]
+        seen = set(reached)
+        for x in reached:
+            for s in gens:
+                y = data[x * n + s]
+                if y not in seen:
+                    seen.add(y)
+                    reached.append(y)
+        return reached
+
+    def __call__(self, x):
+        """
+        Multiplies a pair x of elements (not indices)
+
+        This lets a CayleyTable serve as the function of a binary operation.
+        """
+        index = self.index
+        return self.elems[self.data[index[x[0]] * self.n + index[x[1]]]]
+
+def cayley_table(elems, op):
+    """
+    Returns the CayleyTable of op on the list elems
+
+    op takes a pair of elements, like the bin_op of a Group, and is called
+    exactly len(elems)**2 times.
+    """
+    elems = list(elems)
+    index = dict((g, i) for i, g in enumerate(elems))
+    data = array(_typecode(len(elems)))
+    try:
+        for a in elems:
+            data.extend([index[op((a, b))] for b in elems])
+    except KeyError:
+        raise ValueError("op returns some value outside of elems")
+    return CayleyTable(elems, data)
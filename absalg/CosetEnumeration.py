@@ -0,0 +1,221 @@
+"""
+Implementation of Todd-Coxeter coset enumeration
+"""
+
+import time
+from array import array
+
+from CayleyTable import CayleyTable, _typecode
+
+class CosetEnumeration:
+    """
+    Definition of a coset enumeration, by the Todd-Coxeter (HLT) method
+
+    The group is given by a presentation: gens is a string of generator
+    letters, and each relator is a string of them that equals the identity,
+    with an upper case letter for the inverse of a generator. For example,
+    the dihedral group of order 2n is CosetEnumeration("rs", ["r" * n, "ss",
+    "rsrs"]). The cosets enumerated are those of the subgroup generated by
+    the words in subgroup, which is trivial by default, so that the cosets
+    are the elements of the group.
+
+    Coset 0 is the subgroup itself, and the rest are numbered in
+    breadth-first order. table[c][x] is the coset that coset c goes to under
+    column x, where column 2 * k is gens[k] and column 2 * k + 1 its
+    inverse, and words[c] is a shortest word taking coset 0 to coset c.
+    stats records how much work the enumeration took.
+    """
+
+    def __init__(self, gens, relators, subgroup=(), max_cosets=1000000, \
+                 max_time=None):
+        """
+        Run the enumeration
+
+        Raises RuntimeError if more than max_cosets cosets are ever defined,
+        or if it takes longer than max_time seconds.
+        """
+        if len(set(gens)) != len(gens) or \
+           any(not g.islower() or g == "e" for g in gens):
+            raise ValueError("gens must be distinct lower case letters, " \
+                             "other than e")
+        self.gens = gens
+        self.subgroup = list(subgroup)
+        self.letters = "".join(g + g.upper() for g in gens)
+        self.max_cosets = max_cosets
+        self.max_time = max_time
+        self._start = time.time()
+        self.stats = {"defined": 0, "max_live": 0, "deductions": 0, \
+                      "coincidences": 0}
+
+        relators = [self._columns(w) for w in relators]
+        self._table = []
+        self._parent = []
+        self._live = 0
+        self._define(None, None)
+        for w in self.subgroup:
+            self._scan_and_fill(0, self._columns(w))
+
+        c = 0
+        while c < len(self._table):
+            for w in relators:
+                if self._parent[c] != c: break
+                self._scan_and_fill(c, w)
+            if self._parent[c] == c:
+                for x in xrange(len(self.letters)):
+                    if self._table[c][x] is None:
+                        self._define(c, x)
+            c += 1
+
+        self._standardize()
+        self.stats["index"] = len(self.table)
+        self.stats["seconds"] = time.time() - self._start
+
+    def _columns(self, word):
+        """Returns the list of columns of the letters in word"""
+        try:
+            return [self.letters.index(l) for l in word]
+        except ValueError:
+            raise ValueError("word %r isn't made of generators" % word)
+
+    def _define(self, c, x):
+        """Defines a new coset, as c under column x"""
+        if self.stats["defined"] >= self.max_cosets:
+            raise RuntimeError("coset enumeration exceeded max_cosets")
+        if self.max_time is not None and self.stats["defined"] % 1024 == 0 \
+           and time.time() - self._start > self.max_time:
+            raise RuntimeError("coset enumeration exceeded max_time")
+
+        d = len(self._table)
+        self._table.append([None] * len(self.letters))
+        self._parent.append(d)
+        self.stats["defined"] += 1
+        self._live += 1
+        self.stats["max_live"] = max(self.stats["max_live"], self._live)
+        if c is not None:
+            self._table[c][x] = d
+            self._table[d][x ^ 1] = c
+
+    def _scan_and_fill(self, c, w):
+        """
+        Traces the relator w from coset c, forwards and backwards, defining
+        new cosets to close the gap, and records a deduction or coincidence
+        when the two ends meet
+        """
+        table = self._table
+        f, i = c, 0
+        b, j = c, len(w) - 1
+        while True:
+            while i <= j and table[f][w[i]] is not None:
+                f = table[f][w[i]]
+                i += 1
+            if i > j:
+                if f != b:
+                    self._coincidence(f, b)
+                return
+            while j >= i and table[b][w[j] ^ 1] is not None:
+                b = table[b][w[j] ^ 1]
+                j -= 1
+            if j < i:
+                self._coincidence(f, b)
+                return
+            if i == j:
+                table[f][w[i]] = b
+                table[b][w[i] ^ 1] = f
+                self.stats["deductions"] += 1
+                return
+            self._define(f, w[i])
+
+    def _rep(self, c):
+        """Returns the live coset that c has been identified with"""
+        parent = self._parent
+        r = c
+        while parent[r] != r:
+            r = parent[r]
+        while parent[c] != r:
+            parent[c], c = r, parent[c]
+        return r
+
+    def _merge(self, c, d, queue):
+        """Identifies cosets c and d, queueing the larger one to be removed"""
+        c, d = self._rep(c), self._rep(d)
+        if c != d:
+            c, d = min(c, d), max(c, d)
+            self._parent[d] = c
+            self._live -= 1
+            queue.append(d)
+
+    def _coincidence(self, c, d):
+        """Identifies cosets c and d, and everything that follows from it"""
+        self.stats["coincidences"] += 1
+        table = self._table
+        queue = []
+        self._merge(c, d, queue)
+        for g in queue:
+            for x in xrange(len(self.letters)):
+                h = table[g][x]
+                if h is None:
+                    continue
+                table[h][x ^ 1] = None
+                m, n = self._rep(g), self._rep(h)
+                if table[m][x] is not None:
+                    self._merge(n, table[m][x], queue)
+                elif table[n][x ^ 1] is not None:
+                    self._merge(m, table[n][x ^ 1], queue)
+                else:
+                    table[m][x] = n
+                    table[n][x ^ 1] = m
+
+    def _standardize(self):
+        """
+        Renumbers the live cosets in breadth-first order from coset 0, and
+        records a shortest word for each
+        """
+        old = self._table
+        number = {0: 0}
+        order = [0]
+        self.words = [""]
+        self._tree = [None]
+        for c in order:
+            for x in xrange(len(self.letters)):
+                d = old[c][x]
+                if d not in number:
+                    number[d] = len(order)
+                    order.append(d)
+                    self.words.append(self.words[number[c]] + self.letters[x])
+                    self._tree.append((number[c], x))
+        self.table = [[number[d] for d in old[c]] for c in order]
+        del self._table, self._parent
+
+    def __len__(self):
+        """The number of cosets"""
+        return len(self.table)
+
+    def coset(self, word):
+        """Returns the coset that coset 0 goes to under word"""
+        c = 0
+        for x in self._columns(word):
+            c = self.table[c][x]
+        return c
+
+    def cayley_table(self, labels=None):
+        """
+        Returns the CayleyTable of the group, when the subgroup is trivial
+
+        The element for coset c is labels[c], or by default words[c], with
+        the identity as "e". The table is filled in along the
+        breadth-first tree, with one lookup per entry.
+        """
+        if self.subgroup:
+            raise ValueError("the cosets are only elements if the subgroup " \
+                             "is trivial")
+        n = len(self.table)
+        if labels is None:
+            labels = ["e"] + self.words[1:]
+        data = array(_typecode(n), [0]) * (n * n)
+        for i in xrange(n):
+            row = i * n
+            data[row] = i
+            for j in xrange(1, n):
+                k, x = self._tree[j]
+                data[row + j] = self.table[data[row + k]][x]
+        return CayleyTable(labels, data)
@@ -0,0 +1,72 @@
+"""
+Implementation of coset tables
+"""
+
+from array import array
+
+from Set import Set
+from CayleyTable import CayleyTable, _typecode
+
+class Cosets:
+    """
+    Definition of the cosets of a subgroup of a finite Group
+
+    The cosets are numbered from 0, with the subgroup itself as coset 0.
+    labels maps each GroupElem of the group to the number of its coset, and
+    representatives[i] is a GroupElem in coset i, so representatives is a
+    transversal. The cosets are left cosets g * H, or right cosets H * g if
+    left is False.
+    """
+
+    def __init__(self, group, subgroup, left=True):
+        """
+        Label every element with its coset, in one pass over the group
+
+        Each element not labelled yet starts a new coset, which is labelled
+        by multiplying it by the elements of the subgroup.
+        """
+        if not subgroup <= group:
+            raise ValueError("subgroup must be a subgroup of group")
+        self.group = group
+        self.subgroup = subgroup
+        self.left = left
+
+        H = [group._elem(h) for h in subgroup.Set]
+        self.labels = {}
+        self.representatives = []
+        self._cosets = []
+        for g in group:
+            if g in self.labels: continue
+            k = len(self.representatives)
+            self.representatives.append(g)
+            coset = [g * h for h in H] if left else [h * g for h in H]
+            for x in coset:
+                self.labels[x] = k
+            self._cosets.append(Set(x.elem for x in coset))
+
+    def __len__(self):
+        """The number of cosets, which is the index of the subgroup"""
+        return len(self.representatives)
+
+    def project(self, g):
+        """Returns the number of the coset of the GroupElem g"""
+        return self.labels[g]
+
+    def coset(self, i):
+        """Returns coset i, as a Set of elements (not GroupElems)"""
+        return self._cosets[i]
+
+    def cayley_table(self):
+        """
+        Returns the CayleyTable of the quotient group, whose element i is
+        coset i, as a Set
+
+        The subgroup must be normal. Each product costs one product of
+        representatives and one label lookup.
+        """
+        reps = self.representatives
+        labels = self.labels
+        data = array(_typecode(len(reps)))
+        for a in reps:
+            data.extend([labels[a * b] for b in reps])
+        return CayleyTable(self._cosets, data)
@@ -2,33 +2,56 @@
 Definition of a function
 """
 
-from Set import Set
+from Set import Set, CartesianProduct
 
 class Function:
     """Definition of a finite function"""
-    def __init__(self, domain, codomain, function):
+    def __init__(self, domain, codomain, function, check=True):
         """
         Initialize the function and check that it is well-formed.
 
+        Pass check=False to skip evaluating function over the whole domain,
+        when it is known to land in the codomain.
+
         This method can be overwritten by subclasses of Function, so that for
         example GroupHomomorphisms can be between Groups, rather than Sets.
         """
-        if not isinstance(domain, Set):
+        if not isinstance(domain, (Set, CartesianProduct)):
             raise TypeError("Domain must be a Set")
         if not isinstance(codomain, Set):
             raise TypeError("Codomain must be a Set")
-        if not all(function(elem) in codomain for elem in domain):
+        if check and not all(function(elem) in codomain for elem in domain):
             raise TypeError("Function returns some value outside of codomain")
 
         self.domain = domain
         self.codomain = codomain
         self.function = function
+        self._table = None
+        self._fiber_index = None
 
     def __call__(self, elem):
+        if self._table is not None:
+            try:
+                return self._table[elem]
+            except (KeyError, TypeError):
+                raise TypeError("Function must be called on elements of the " \
+                                "domain")
         if elem not in self.domain:
             raise TypeError("Function must be called on elements of the domain")
         return self.function(elem)
 
+    def tabulate(self):
+        """
+        Evaluates self once on its whole domain, so that later calls are
+        dict lookups, and returns self
+        """
+        if self._table is None:
+            self._table = dict((x, self.function(x)) for x in self.domain)
+        return self
+
+    def is_tabulated(self):
+        return self._table is not None
+
     def __hash__(self):
         """Returns the hash of self"""
 
@@ -43,24 +66,51 @@ class Function:
         # Finally, we should make sure that if you switch the domain and 
         # codomain, the hash will (usually) change, so you can't just add or
         # multiply the hashes together.
+        #
+        # The domain only contributes its size: it's often a CartesianProduct,
+        # and hashing that would build every pair in it.
 
-        return hash(self.domain) + 2 * hash(self.codomain)
+        return len(self.domain) + 2 * hash(self.codomain)
 
     def __eq__(self, other):
         if not isinstance(other, Function):
             return False
 
-        return id(self) == id(other) or ( \
-               self.domain == other.domain and \
+        if id(self) == id(other):
+            return True
+        if self._table is not None and other._table is not None:
+            return self.domain == other.domain and \
+                   self.codomain == other.codomain and \
+                   self._table == other._table
+        return ( self.domain == other.domain and \
                self.codomain == other.codomain and \
                all(self(elem) == other(elem) for elem in self.domain) )
 
     def __ne__(self, other):
         return not self == other
 
+    def _fibers(self):
+        """
+        The dict from each element of the image to the list of its
+        preimages, which is computed with a single pass over the domain and
+        then cached
+        """
+        if self._fiber_index is None:
+            fibers = {}
+            for x in self.domain:
+                fibers.setdefault(self(x), []).append(x)
+            self._fiber_index = fibers
+        return self._fiber_index
+
     def _image(self):
         """The literal image of the function"""
-        return Set(self(elem) for elem in self.domain)
+        return Set(self._fibers())
+
+    def preimage(self, elem):
+        """Returns the Set of elements of the domain that map to elem"""
+        if elem not in self.codomain:
+            raise TypeError("elem must be an element of the codomain")
+        return Set(self._fibers().get(elem, ()))
 
     def image(self):
         """
@@ -83,24 +133,37 @@ class Function:
                "".join(formatstr2.format("", y) for y in nothit))
 
     def is_surjective(self):
-        # Need to make self.domain into a Set, since it might not be in
-        # subclasses of Function
-        return self._image() == Set(self.codomain)
+        # The image is a subset of the codomain, so it's enough to count it
+        return len(self._fibers()) == len(self.codomain)
 
     def is_injective(self):
-        return len(self._image()) == len(self.domain)
+        return len(self._fibers()) == len(self.domain)
 
     def is_bijective(self):
         return self.is_surjective() and self.is_injective()
 
     def compose(self, other):
-        """Returns x -> self(other(x))"""
+        """
+        Returns x -> self(other(x))
+
+        If self and other are both tabulated, so is the result, and it's
+        built with one lookup in each table per element of the domain, so
+        that calling a long chain of compositions is still a single lookup.
+        """
         if not self.domain == other.codomain:
             raise ValueError("codomain of other must match domain of self")
-        return Function(other.domain, self.codomain, lambda x: self(other(x)))
-
-    def new_domains(self, domain, codomain):
-        return Function(domain, codomain, self.function)
+        if self._table is not None and other._table is not None:
+            outer = self._table
+            table = dict((x, outer[y]) for x, y in other._table.iteritems())
+            result = Function(other.domain, self.codomain, table.__getitem__, \
+                              check=False)
+            result._table = table
+            return result
+        return Function(other.domain, self.codomain, lambda x: self(other(x)), \
+                        check=False)
+
+    def new_domains(self, domain, codomain, check=True):
+        return Function(domain, codomain, self.function, check)
 
 def identity(s):
     """Returns the identity function on the set s"""
@@ -1,25 +1,54 @@
 """Group implementation"""
 
 import itertools
+import operator
+from array import array
+from fractions import gcd
 
-from Set import Set
-from Function import Function
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
-class GroupElem:
+from Set import Set, CartesianProduct
+from Function import Function
+from CayleyTable import cayley_table, _typecode
+from BitSet import bitset
+from Verification import associativity_counterexample, \
+                         homomorphism_counterexample, _pool_imap
+from CosetEnumeration import CosetEnumeration
+from Cosets import Cosets
+from SubgroupLattice import SubgroupLattice, iter_subgroups
+
+class GroupElem(object):
     """
     Group element definition
     
     This is mainly syntactic sugar, so you can write stuff like g * h
     instead of group.bin_op(g, h), or group(g, h).
+
+    GroupElems are interned: each Group holds exactly one GroupElem for each
+    of its elements, which GroupElem(elem, group) returns.
     """
 
-    def __init__(self, elem, group):
+    __slots__ = ("elem", "group", "_order")
+
+    def __new__(cls, elem, group):
         if not isinstance(group, Group):
             raise TypeError("group is not a Group")
         if not elem in group.Set:
             raise TypeError("elem is not an element of group")
-        self.elem = elem
-        self.group = group
+        return group._elem(elem)
+
+    def __reduce__(self):
+        """
+        Pickles self with its Group, so that the copy is interned in the
+        copy of the Group
+        """
+        return (_unpickle_elem, (self.elem,), (self.group, self._order))
+
+    def __setstate__(self, state):
+        self.group, self._order = state
 
     def __str__(self):
         return str(self.elem)
@@ -30,9 +59,12 @@ class GroupElem:
         regardless of the Groups they belong to
         """
 
+        if self is other:
+            return True
         if not isinstance(other, GroupElem):
             raise TypeError("other is not a GroupElem")
-        return self.elem == other.elem
+        # GroupElems are interned, so two in the same Group are different
+        return self.group is not other.group and self.elem == other.elem
 
     def __ne__(self, other):
         return not self == other
@@ -51,6 +83,14 @@ class GroupElem:
         if not isinstance(other, GroupElem):
             raise TypeError("other must be a GroupElem, or an int " \
                             "(if self's group is abelian)")
+
+        group = self.group
+        if other.group is group:
+            table = group.table
+            if table is not None:
+                return group._by_index[table.data[table.index[self.elem] * \
+                                       table.n + table.index[other.elem]]]
+            return group._elem(group.bin_op.function((self.elem, other.elem)))
         try:
             return GroupElem(self.group.bin_op((self.elem, other.elem)), \
                              self.group)
@@ -85,18 +125,57 @@ class GroupElem:
         Returns self**n
         
         modulo is included as an argument to comply with the API, and ignored
+
+        This is square-and-multiply, with the exponent first reduced modulo
+        the order of self once that's known, so it takes O(log n) products.
         """
         if not isinstance(n, (int, long)):
             raise TypeError("n must be an int or a long")
 
-        if n == 0:
-            return self.group.e
+        if self._order is not None:
+            n %= self._order
         elif n < 0:
             return self.group.inverse(self) ** -n
-        elif n % 2 == 1:
-            return self * (self ** (n - 1))
-        else:
-            return (self * self) ** (n / 2)
+        return self._powers([n])[0]
+
+    def powers(self, exponents):
+        """
+        Returns the list of self**n for each n in exponents
+
+        The squares self, self**2, self**4, ... are computed once and shared
+        by all of the exponents.
+        """
+        exponents = list(exponents)
+        if not all(isinstance(n, (int, long)) for n in exponents):
+            raise TypeError("exponents must be ints or longs")
+
+        if self._order is not None:
+            return self._powers([n % self._order for n in exponents])
+        result = self._powers([max(n, 0) for n in exponents])
+        negative = [i for i, n in enumerate(exponents) if n < 0]
+        if negative:
+            inverse = self.group.inverse(self)
+            for i, g in zip(negative, \
+                            inverse._powers([-exponents[i] for i in negative])):
+                result[i] = g
+        return result
+
+    def _powers(self, exponents):
+        """Returns the list of self**n, for non-negative ints n in exponents"""
+        squares = [self]
+        top = max(exponents).bit_length() if exponents else 0
+        while len(squares) < top:
+            squares.append(squares[-1] * squares[-1])
+        result = []
+        for n in exponents:
+            g = None
+            for x in squares:
+                if n & 1:
+                    g = x if g is None else g * x
+                n >>= 1
+                if not n: break
+            result.append(self.group.e if g is None else g)
+        return result
 
     def __neg__(self):
         """Returns self ** -1 if self is in an abelian group"""
@@ -111,56 +190,366 @@ class GroupElem:
         return self * (other ** -1)
 
     def order(self):
-        """Returns the order of self in the Group"""
-        return len(self.group.generate([self]))
+        """
+        Returns the order of self in the Group
+
+        This multiplies by self until it gets back to the identity. The walk
+        passes through every power of self, so it caches all of their
+        orders, not just the order of self.
+        """
+        if self._order is None:
+            e = self.group.e
+            powers = [self] # powers[j] is self ** (j + 1)
+            while powers[-1] is not e:
+                powers.append(powers[-1] * self)
+            k = len(powers)
+            for j, g in enumerate(powers, 1):
+                g._order = k // gcd(j, k)
+        return self._order
+
+
+def _generators(G, op):
+    """
+    Returns a list of elements of G, such that every element of G is a
+    product ((g1 * g2) * g3) * ... of them
+
+    This doesn't assume that op is associative, so it can be used before
+    the group axioms have been checked. Each new generator is an element that
+    the previous ones don't reach, so for a group there are at most
+    log_2(len(G)) + 1 of them, and op is called O(len(G) * len(gens)) times.
+    """
+    gens = []
+    reached = set()
+    for g in G:
+        if g in reached: continue
+        gens.append(g)
+        queue = [g] + [op((x, g)) for x in reached]
+        while queue:
+            x = queue.pop()
+            if x not in reached:
+                reached.add(x)
+                queue.extend(op((x, s)) for s in gens)
+    return gens
+
+
+def _pair_inverses(G, e, mul):
+    """
+    Returns a dict from each element of G to its inverse
+
+    e is the identity, and mul(a, b) returns a * b.
+    """
+    inverses = {e: e}
+    for g in G:
+        if g in inverses: continue
+        powers = [e]
+        x = g
+        while x != e:
+            powers.append(x)
+            x = mul(x, g)
+        k = len(powers)
+        for i in xrange(1, k):
+            inverses[powers[i]] = powers[k - i]
+    return inverses
+
+
+def _search(gens, e, mul):
+    """
+    Breadth-first search of a Cayley graph from e, along right
+    multiplication by gens, where mul(a, b) returns a * b
+
+    Returns the list of elements reached, in order, and a dict from each of
+    them but e to a pair (x, i), where x was reached earlier and
+    x * gens[i] is the element. The elements reached make up the subgroup
+    generated by gens, and each of them costs len(gens) products.
+    """
+    reached = [e]
+    parent = {e: None}
+    frontier = [e]
+    while frontier:
+        new = []
+        for x in frontier:
+            for i, s in enumerate(gens):
+                y = mul(x, s)
+                if y not in parent:
+                    parent[y] = (x, i)
+                    new.append(y)
+        reached.extend(new)
+        frontier = new
+    del parent[e]
+    return reached, parent
+
+
+def _extend_isomorphism(table_a, table_b, A, B):
+    """
+    Returns the list of indices of table_b that the indices of table_a map
+    to, under the isomorphism sending each A[i] to B[i], or None if there
+    isn't such an isomorphism
+
+    A must generate table_a. The map is extended by a breadth-first search
+    of the Cayley graph, with f(x * A[i]) = f(x) * B[i], and it's a
+    homomorphism if this is consistent on every edge. That takes
+    len(A) lookups per element.
+    """
+    n = table_a.n
+    da, db = table_a.data, table_b.data
+    pairs = zip(A, B)
+    image = [None] * n
+    image[0] = 0
+    used = [False] * n
+    used[0] = True
+    reached = [0]
+    for x in reached:
+        fx = image[x]
+        for a, b in pairs:
+            y = da[x * n + a]
+            fy = db[fx * n + b]
+            if image[y] is None:
+                if used[fy]:
+                    return None
+                image[y] = fy
+                used[fy] = True
+                reached.append(y)
+            elif image[y] != fy:
+                return None
+    return image
+
+def _extend_isomorphisms(tables, batch):
+    """
+    Returns the list of the images, as in _extend_isomorphism, of the
+    isomorphisms sending A to each B in batch, where tables is (table_a,
+    table_b, A)
+    """
+    table_a, table_b, A = tables
+    found = []
+    for B in batch:
+        image = _extend_isomorphism(table_a, table_b, A, B)
+        if image is not None:
+            found.append(image)
+    return found
+
+def _unpickle_elem(elem):
+    """
+    Returns a GroupElem of elem whose Group is filled in by __setstate__, as
+    the Group may still be being unpickled
+    """
+    g = object.__new__(GroupElem)
+    g.elem = elem
+    g.group = None
+    g._order = None
+    return g
 
 
-class Group:
+class Group(object):
     """Group definition"""
-    def __init__(self, G, bin_op):
-        """Create a group, checking group axioms"""
+    def __init__(self, G, bin_op, full_check=False, trusted=False, \
+                 workers=None, chunksize=None):
+        """
+        Create a group, checking group axioms
+
+        Associativity is checked with Light's test: with gens a generating
+        set, it's enough that (a * s) * c == a * (s * c) for every a and c in
+        G and s in gens, which takes O(len(G)**2 * len(gens)) products. The
+        identity and inverses then only need checking against gens. Pass
+        full_check=True to check every triple of elements instead.
+
+        Pass trusted=True to skip all of the checks, for groups which are
+        correct by construction. The identity, the GroupElems and whether
+        the group is abelian are then only computed when they're first used.
+
+        Pass workers to check the axioms in parallel instead: bin_op is
+        tabulated, which costs len(G)**2 calls to it in this process, and
+        the associativity check on the table is split over that many
+        processes, chunksize rows of the table at a time. The group is then
+        left tabulated.
+        """
 
         # Test types
         if not isinstance(G, Set): raise TypeError("G must be a set")
         if not isinstance(bin_op, Function):
             raise TypeError("bin_op must be a function")
+
+        self.Set = G
+        self.bin_op = bin_op
+        self.table = None
+        self._e = None
+        self._group_elems = None
+        self._abelian = None
+        self._generators = None
+        self._inverses = None
+        self._interned = {}
+        self._classes = None
+        self._class_of = None
+        self._center = None
+        self._fingerprint = None
+        self._normal_in = {}
+        self._factors = None
+        self._index_arrays = None
+        self._exponent = None
+        if trusted:
+            return
+
         if bin_op.codomain != G:
             raise TypeError("binary operation must have codomain equal to G")
-        if bin_op.domain != G * G:
+        if bin_op.domain != CartesianProduct(G, G):
             raise TypeError("binary operation must have domain equal to G * G")
 
-        # Test associativity
-        if not all(bin_op((a, bin_op((b, c)))) == \
-                   bin_op((bin_op((a, b)), c)) \
-                   for a, b, c in itertools.product(G, G, G)):
+        # bin_op's domain is G * G, so we can skip its membership test
+        op = bin_op.function
+        gens = _generators(G, op)
+
+        if workers is not None:
+            e = self._check_table(op, gens, full_check, workers, chunksize)
+
+        elif full_check:
+            # Test associativity
+            if not all(op((a, op((b, c)))) == op((op((a, b)), c)) \
+                       for a, b, c in itertools.product(G, G, G)):
+                raise ValueError("binary operation is not associative")
+
+            # Find the identity
+            found_id = False
+            for e in G:
+                if all(op((e, a)) == a for a in G):
+                    found_id = True
+                    break
+            if not found_id:
+                raise ValueError("G doesn't have an identity")
+
+            # Test for inverses
+            for a in G:
+                if not any(op((a,  b)) == e for b in G):
+                    raise ValueError("G doesn't have inverses")
+
+        else:
+            # Test associativity, with Light's test
+            for s in gens:
+                sc = dict((c, op((s, c))) for c in G)
+                for a in G:
+                    a_s = op((a, s))
+                    if not all(op((a_s, c)) == op((a, sc[c])) for c in G):
+                        raise ValueError("binary operation is not associative")
+
+            # Find the identity. Every element is a product of generators, so
+            # by associativity e is an identity if it fixes the generators.
+            found_id = False
+            for e in G:
+                if all(op((e, s)) == s and op((s, e)) == s for s in gens):
+                    found_id = True
+                    break
+            if not found_id:
+                raise ValueError("G doesn't have an identity")
+
+            # Test for inverses. In a finite monoid, products of invertible
+            # elements are invertible, so it's enough to check the generators.
+            for s in gens:
+                if not any(op((s, b)) == e for b in G):
+                    raise ValueError("G doesn't have inverses")
+
+        # At this point, we've verified that we have a Group.
+        self._e = GroupElem(e, self)
+        self._generators = gens
+
+    def _check_table(self, op, gens, full_check, workers, chunksize):
+        """
+        Checks the group axioms on the Cayley table of op, with the
+        associativity check split over processes, and returns the identity
+
+        The table is kept as self.table, renumbered so that the identity is 0.
+        """
+        table = cayley_table(self.Set, op)
+        mul = table.mul
+        gens = [table.index[s] for s in gens]
+        middle = None if full_check else gens
+        if associativity_counterexample(table, middle, workers, \
+                                        chunksize) is not None:
             raise ValueError("binary operation is not associative")
 
-        # Find the identity
-        found_id = False
-        for e in G:
-            if all(bin_op((e, a)) == a for a in G):
-                found_id = True
+        for e in xrange(len(table)):
+            if all(mul(e, s) == s and mul(s, e) == s for s in gens):
                 break
-        if not found_id:
+        else:
             raise ValueError("G doesn't have an identity")
+        if not all(e in table.row(s) for s in gens):
+            raise ValueError("G doesn't have inverses")
 
-        # Test for inverses
-        for a in G:
-            if not any(bin_op((a,  b)) == e for b in G):
-                raise ValueError("G doesn't have inverses")
+        self.table = table.renumber([e] + [i for i in xrange(len(table)) \
+                                           if i != e])
+        self._by_index = [self._elem(g) for g in self.table.elems]
+        return self.table.elems[0]
 
-        # At this point, we've verified that we have a Group.
-        # Now determine if the Group is abelian:
-        self.abelian = all(bin_op((a, b)) == bin_op((b, a)) \
-                           for a, b in itertools.product(G, G))
+    def _elem(self, x):
+        """
+        Returns the GroupElem of x, which must already be known to be in self
+        """
+        try:
+            return self._interned[x]
+        except KeyError:
+            g = object.__new__(GroupElem)
+            g.elem = x
+            g.group = self
+            g._order = None
+            self._interned[x] = g
+            return g
+
+    @property
+    def e(self):
+        """The identity, found on first use"""
+        if self._e is None:
+            # The identity is the only element with e * e == e
+            op = self.bin_op.function
+            for e in self.Set:
+                if op((e, e)) == e:
+                    self._e = GroupElem(e, self)
+                    break
+            else:
+                raise RuntimeError("Didn't find an identity")
+        return self._e
+
+    @property
+    def group_elems(self):
+        """The Set of GroupElems in self, built on first use"""
+        if self._group_elems is None:
+            self._group_elems = Set(GroupElem(g, self) for g in self.Set)
+        return self._group_elems
+
+    @property
+    def abelian(self):
+        """
+        Whether self is abelian, computed on first use
 
-        self.Set = G
-        self.group_elems = Set(GroupElem(g, self) for g in G)
-        self.e = GroupElem(e, self)
-        self.bin_op = bin_op
+        A group is abelian if and only if its generators commute.
+        """
+        if self._abelian is None:
+            op = self.bin_op.function
+            self._abelian = all(op((a, b)) == op((b, a)) for a, b in \
+                                itertools.combinations(self._gens(), 2))
+        return self._abelian
+
+    def _gens(self):
+        """Returns a list of elements (not GroupElems) that generate self"""
+        if self._generators is None:
+            self._generators = _generators(self.Set, self.bin_op.function)
+        return self._generators
+
+    def tabulate(self):
+        """
+        Switches self to a dense integer Cayley table, and returns self
+
+        The elements are numbered in iteration order, so the identity is 0.
+        The table costs len(self)**2 calls to bin_op, once; after that,
+        products of GroupElems, inverse, generate, subgroups and printing
+        all work on indices.
+        """
+        if self.table is None:
+            self.table = cayley_table((g.elem for g in self), self.bin_op)
+            self._by_index = [self._elem(g) for g in self.table.elems]
+        return self
 
     def __iter__(self):
         """Iterate over the GroupElems in G, returning the identity first"""
+        if self.table is not None:
+            for g in self._by_index: yield g
+            return
         yield self.e
         for g in self.group_elems:
             if g != self.e: yield g
@@ -169,7 +558,9 @@ class Group:
         return item in self.group_elems
 
     def __hash__(self):
-        return hash(self.Set) ^ hash(self.bin_op)
+        # Equal Groups have equal Sets, and hashing bin_op would mean hashing
+        # its whole domain
+        return hash(self.Set)
 
     def __eq__(self, other):
         if not isinstance(other, Group):
@@ -191,6 +582,9 @@ class Group:
         if len(self) > len(letters):
             return "This group is too big to print a Cayley table"
 
+        if self.table is not None:
+            return self._table_str(letters)
+
         # connect letters to elements
         toletter = {}
         toelem = {}
@@ -213,55 +607,367 @@ class Group:
         result += border
         return result
 
+    def _table_str(self, letters):
+        """Returns the Cayley table, reading products off of self.table"""
+        n = len(self)
+        mul = self.table.mul
+        letters = letters[:n]
+        result = "\n".join("%s: %s" % (l, g) for l, g in \
+                           itertools.izip(letters, self._by_index)) + "\n\n"
+        head = "   | " + " | ".join(l for l in letters) + " |"
+        border = (n + 1) * "---+" + "\n"
+        result += head + "\n" + border
+        result += border.join(" %s | " % letters[i] + \
+                              " | ".join(letters[mul(i, j)] for j in xrange(n)) + \
+                              " |\n" for i in xrange(n))
+        result += border
+        return result
+
     def is_abelian(self):
         """Checks if the group is abelian"""
         return self.abelian
 
     def __le__(self, other):
-        """Checks if self is a subgroup of other"""
+        """
+        Checks if self is a subgroup of other
+
+        Every element of self is a product of generators, so the operations
+        agree everywhere if they agree on the products a * s, for a in self
+        and s a generator of self.
+        """
         if not isinstance(other, Group):
             raise TypeError("other must be a Group")
+        op, other_op = self.bin_op.function, other.bin_op.function
         return self.Set <= other.Set and \
-               all(self.bin_op((a, b)) == other.bin_op((a, b)) \
-                   for a, b in itertools.product(self.Set, self.Set))
+               all(op((a, s)) == other_op((a, s)) \
+                   for a in self.Set for s in self._gens())
 
     def is_normal_subgroup(self, other):
-        """Checks if self is a normal subgroup of other"""
-        return self <= other and \
-               all(Set(g * h for h in self) == Set(h * g for h in self) \
-                   for g in other)
+        """
+        Checks if self is a normal subgroup of other
+
+        It's enough that conjugating the generators of self by the
+        generators of other stays in self. The result is cached in self, so
+        that other doesn't keep every subgroup it's tested against alive.
+        """
+        cached = self._normal_in.get(id(other))
+        if cached is not None and cached[0] is other:
+            return cached[1]
+        result = self <= other and \
+                 all(x.elem in self.Set for x in \
+                     other._conjugates(other._elem(h) for h in self._gens()))
+        self._normal_in[id(other)] = (other, result)
+        return result
+
+    def _conjugates(self, elems):
+        """
+        Yields t * x * s for each GroupElem x in elems, each generator s of
+        self, and t the inverse of s
+        """
+        gens = self.generators()
+        conjugators = zip(gens, self.inverses(gens))
+        for x in elems:
+            for s, t in conjugators:
+                yield t * x * s
+
+    def normal_closure(self, elems):
+        """
+        Returns the smallest normal subgroup of self containing the
+        GroupElems elems
+
+        This keeps conjugating generators by the generators of self, adding
+        any conjugate that isn't in the subgroup yet as a new generator.
+        """
+        gens = [g if isinstance(g, GroupElem) else GroupElem(g, self) \
+                for g in elems]
+        if not all(g in self.group_elems for g in gens):
+            raise ValueError("elems must be a subset of self.group_elems")
+        gens = [self._elem(g.elem) for g in gens]
+
+        # The subgroup generated so far, closed under right multiplication by
+        # closing_gens. Adding a generator only multiplies the elements
+        # already reached by it, and the new elements by every generator.
+        reached = [self.e]
+        seen = set(reached)
+        closing_gens = []
+        def close(g):
+            closing_gens.append(g)
+            start = len(reached)
+            for x in reached[:start]:
+                y = x * g
+                if y not in seen:
+                    seen.add(y)
+                    reached.append(y)
+            for x in itertools.islice(reached, start, None):
+                for s in closing_gens:
+                    y = x * s
+                    if y not in seen:
+                        seen.add(y)
+                        reached.append(y)
+
+        for g in gens:
+            if g not in seen:
+                close(g)
+        i = 0
+        while i < len(gens):
+            for y in self._conjugates([gens[i]]):
+                if y not in seen:
+                    gens.append(y)
+                    close(y)
+            i += 1
+
+        N = self._subgroup(Set(x.elem for x in reached))
+        N._normal_in[id(self)] = (self, True)
+        return N
 
     def __div__(self, other):
         """ Returns the quotient group self / other """
         if not other.is_normal_subgroup(self):
             raise ValueError("other must be a normal subgroup of self")
-        G = Set(Set(self.bin_op((g, h)) for h in other.Set) for g in self.Set)
+        return CayleyGroup(self.cosets(other).cayley_table())
 
-        def multiply_cosets(x):
-            h = x[0].pick()
-            return Set(self.bin_op((h, g)) for g in x[1])
+    def quotient_map(self, other):
+        """
+        Returns the projection from self onto self / other, as a
+        GroupHomomorphism that looks each element's coset up in a table
+        """
+        if not other.is_normal_subgroup(self):
+            raise ValueError("other must be a normal subgroup of self")
+        C = self.cosets(other)
+        Q = CayleyGroup(C.cayley_table())
+        return _table_homomorphism(self, Q, dict((g, Q._by_index[i]) \
+                                   for g, i in C.labels.iteritems()))
 
-        return Group(G, Function(G * G, G, multiply_cosets))
+    def cosets(self, other, left=True):
+        """
+        Returns the Cosets of the subgroup other in self: left cosets, or
+        right cosets if left is False
+        """
+        return Cosets(self, other, left)
+
+    def left_transversal(self, other):
+        """Returns a list with a GroupElem from each left coset of other"""
+        return self.cosets(other).representatives
+
+    def right_transversal(self, other):
+        """Returns a list with a GroupElem from each right coset of other"""
+        return self.cosets(other, left=False).representatives
 
     def inverse(self, g):
         """Returns the inverse of elem"""
         if not g in self.group_elems:
             raise TypeError("g isn't a GroupElem in the Group")
-        for a in self:
-            if g * a == self.e:
-                return a
-        raise RuntimeError("Didn't find an inverse for g")
+        return GroupElem(self._inverse_map()[g.elem], self)
+
+    def inverses(self, elems):
+        """Returns the list of inverses of the GroupElems elems"""
+        elems = list(elems)
+        if not all(g in self.group_elems for g in elems):
+            raise TypeError("elems must be GroupElems in the Group")
+        inverses = self._inverse_map()
+        return [GroupElem(inverses[g.elem], self) for g in elems]
+
+    def powers(self, elems, n):
+        """
+        Returns the list of g**n for each GroupElem g in elems
+
+        On a tabulated Group, the powers are all computed together on
+        indices, as in index_powers.
+        """
+        if not isinstance(n, (int, long)):
+            raise TypeError("n must be an int or a long")
+        elems = list(elems)
+        if not all(g in self.group_elems for g in elems):
+            raise TypeError("elems must be GroupElems in the Group")
+        if self.table is None:
+            return [self._elem(g.elem) ** n for g in elems]
+        return self.elements(self.index_powers(self.indices(elems), n))
+
+    def _inverse_map(self):
+        """
+        Returns a dict from each element (not GroupElem) to its inverse
+
+        This is built once, in a single pass: walking the powers g, g**2, ...,
+        g**k == e of an element pairs up g**i with g**(k - i), so each walk
+        finds the inverses of every power of g at once.
+        """
+        if self._inverses is None:
+            if self.table is not None:
+                elems = self.table.elems
+                inverses = _pair_inverses(xrange(len(self)), 0, self.table.mul)
+                inverses = dict((elems[i], elems[j]) \
+                                for i, j in inverses.iteritems())
+            else:
+                op = self.bin_op.function
+                inverses = _pair_inverses(self.Set, self.e.elem, \
+                                          lambda a, b: op((a, b)))
+            self._inverses = inverses
+        return self._inverses
+
+    def indices(self, elems):
+        """
+        Returns the list of indices in self.table of the GroupElems elems,
+        for the index methods below
+        """
+        index = self.tabulate().table.index
+        try:
+            return [index[g.elem] for g in elems]
+        except (AttributeError, KeyError):
+            raise TypeError("elems must be GroupElems in the Group")
+
+    def elements(self, indices):
+        """Returns the list of GroupElems with the given indices"""
+        by_index = self.tabulate()._by_index
+        return [by_index[i] for i in indices]
+
+    def _index_tables(self):
+        """
+        Returns the Cayley table, as an n by n array, and the array of the
+        index of the inverse of each index, as NumPy arrays if NumPy is
+        available and otherwise as a flat array and a list
+        """
+        if self._index_arrays is None:
+            table = self.tabulate().table
+            index, inverses = table.index, self._inverse_map()
+            inv = [index[inverses[x]] for x in table.elems]
+            if numpy is not None:
+                n = len(table)
+                T = numpy.array(table.data, numpy.intp).reshape(n, n)
+                self._index_arrays = (T, numpy.array(inv, numpy.intp))
+            else:
+                self._index_arrays = (table.data, inv)
+        return self._index_arrays
+
+    def _index_array(self, a):
+        """
+        Returns the sequence a of indices as an array, checking that they're
+        all ints, and indices of self.table
+        """
+        n = len(self.tabulate().table)
+        if numpy is not None:
+            a = numpy.asarray(a)
+            if a.ndim != 1:
+                raise ValueError("indices must be one dimensional")
+            if len(a) and a.dtype.kind not in "iu":
+                raise TypeError("indices must be ints")
+            a = a.astype(numpy.intp)
+            low, high = (a.min(), a.max()) if len(a) else (0, 0)
+        else:
+            a = [operator.index(i) for i in a]
+            low, high = (min(a), max(a)) if a else (0, 0)
+        if low < 0 or high >= n:
+            raise ValueError("indices must be indices of self.table")
+        return a
+
+    def index_products(self, a, b):
+        """
+        Returns the array of the indices of a[i] * b[i], for equally long
+        sequences of indices a and b
+
+        The index methods work on the indices of self.table, which they
+        build if need be, without making any GroupElems. With NumPy, they
+        take and return NumPy arrays, and each is a few gathers from the
+        table; otherwise they're loops over the flat table, returning arrays.
+        """
+        a, b = self._index_array(a), self._index_array(b)
+        if len(a) != len(b):
+            raise ValueError("a and b must have the same length")
+        T, inv = self._index_tables()
+        if numpy is not None:
+            return T[a, b]
+        n = len(inv)
+        return array(_typecode(n), [T[i * n + j] for i, j in zip(a, b)])
+
+    def index_table(self, a, b):
+        """
+        Returns the table of the indices of a[i] * b[j], as a 2-d NumPy
+        array, or a list of rows without NumPy
+        """
+        a, b = self._index_array(a), self._index_array(b)
+        T, inv = self._index_tables()
+        if numpy is not None:
+            return T[numpy.ix_(a, b)]
+        n = len(inv)
+        return [array(_typecode(n), [T[i * n + j] for j in b]) for i in a]
+
+    def index_inverses(self, a):
+        """Returns the array of the indices of the inverses of a[i]"""
+        a = self._index_array(a)
+        T, inv = self._index_tables()
+        if numpy is not None:
+            return inv[a]
+        return array(_typecode(len(inv)), [inv[i] for i in a])
+
+    def index_powers(self, a, k):
+        """
+        Returns the array of the indices of a[i] ** k[i], where k is a
+        sequence of ints as long as a, or a single int for every a[i]
+
+        The exponents are first reduced modulo the order of self, which every
+        element's order divides, so any int works, and then the powers are
+        all computed together, by square-and-multiply.
+        """
+        a = self._index_array(a)
+        T, inv = self._index_tables()
+        m = len(inv)
+        if numpy is not None and isinstance(k, numpy.ndarray) and \
+           k.dtype.kind in "iu":
+            if k.shape != a.shape:
+                raise ValueError("k must be an int, or have the same length " \
+                                 "as a")
+            k = numpy.mod(k, m)
+        else:
+            try:
+                k = [operator.index(k) % m] * len(a)
+            except TypeError:
+                k = [operator.index(e) % m for e in k]
+                if len(k) != len(a):
+                    raise ValueError("k must be an int, or have the same " \
+                                     "length as a")
+
+        if numpy is not None:
+            k = numpy.asarray(k, numpy.int64)
+            x = a
+            result = numpy.zeros_like(x)
+            while k.any():
+                odd = k & 1 == 1
+                result[odd] = T[result[odd], x[odd]]
+                x = T[x, x]
+                k >>= 1
+            return result
+
+        n = len(inv)
+        result = array(_typecode(n), [0]) * len(a)
+        for i, x, e in zip(xrange(len(a)), a, k):
+            y = 0
+            while e:
+                if e & 1:
+                    y = T[y * n + x]
+                x = T[x * n + x]
+                e >>= 1
+            result[i] = y
+        return result
+
+    def index_conjugates(self, a, b):
+        """
+        Returns the array of the indices of the conjugates t * a[i] * b[i],
+        where t is the inverse of b[i], like conjugacy_classes
+        """
+        a, b = self._index_array(a), self._index_array(b)
+        if len(a) != len(b):
+            raise ValueError("a and b must have the same length")
+        T, inv = self._index_tables()
+        if numpy is not None:
+            return T[T[inv[b], a], b]
+        n = len(inv)
+        return array(_typecode(n), [T[T[inv[j] * n + i] * n + j] \
+                                  for i, j in zip(a, b)])
 
     def __mul__(self, other):
         """Returns the cartesian product of the two groups"""
         if not isinstance(other, Group):
             raise TypeError("other must be a group")
-        bin_op = Function((self.Set * other.Set) * (self.Set * other.Set), \
-                             (self.Set * other.Set), \
-                             lambda x: (self.bin_op((x[0][0], x[1][0])), \
-                                        other.bin_op((x[0][1], x[1][1]))))
-
-        return Group(self.Set * other.Set, bin_op)
+        return DirectProduct(self, other)
 
     def generate(self, elems):
         """
@@ -281,14 +987,84 @@ class Group:
         if len(elems) == 0:
             raise ValueError("elems must have at least one element")
 
-        oldG = elems
-        while True:
-            newG = oldG | Set(a * b for a, b in itertools.product(oldG, oldG))
-            if oldG == newG: break
-            else: oldG = newG
-        oldG = Set(g.elem for g in oldG)
+        reached, parent = self._search([g.elem for g in elems])
+        return self._subgroup(Set(reached))
+
+    def words(self, elems):
+        """
+        Returns a dict from each GroupElem of the subgroup generated by elems
+        to a word for it: a tuple of indices into the list elems, whose
+        product is that GroupElem. The words are as short as possible.
+        """
+        elems = [g if isinstance(g, GroupElem) else GroupElem(g, self) \
+                 for g in elems]
+        if not all(g in self.group_elems for g in elems):
+            raise ValueError("elems must be a subset of self.group_elems")
+
+        reached, parent = self._search([g.elem for g in elems])
+        words = {reached[0]: ()}
+        for x in reached[1:]:
+            y, i = parent[x]
+            words[x] = words[y] + (i,)
+        return dict((self._elem(x), w) for x, w in words.iteritems())
+
+    def _search(self, gens):
+        """
+        Returns _search(gens, e, mul) on the elements (not GroupElems) of self
+        """
+        if self.table is None:
+            op = self.bin_op.function
+            return _search(gens, self.e.elem, lambda a, b: op((a, b)))
+
+        index = self.table.index
+        elems = self.table.elems
+        reached, parent = _search([index[g] for g in gens], 0, self.table.mul)
+        return ([elems[x] for x in reached], \
+                dict((elems[x], (elems[y], i)) \
+                     for x, (y, i) in parent.iteritems()))
+
+    def bitset(self, elems):
+        """
+        Returns the BitSet of elems, which may be GroupElems or elements of
+        self.Set, indexed by self.table
+        """
+        return bitset(self.tabulate().table, \
+                      (g.elem if isinstance(g, GroupElem) else g for g in elems))
+
+    def _index_subgroup(self, indices):
+        """Returns the subgroup of self with the given element indices"""
+        return self._subgroup(Set(self.table.elems[i] for i in indices))
 
-        return Group(oldG, self.bin_op.new_domains(oldG * oldG, oldG))
+    def _subgroup(self, G):
+        """Returns the subgroup of self on the Set G, which must be closed"""
+        bin_op = self.bin_op.new_domains(CartesianProduct(G, G), G, check=False)
+        return Group(G, bin_op, trusted=True)
+
+    def element_orders(self):
+        """Returns a dict from each GroupElem of self to its order"""
+        return dict((g, g.order()) for g in self)
+
+    def order_statistics(self):
+        """
+        Returns a dict from each order of an element of self to the number of
+        elements with that order
+        """
+        stats = {}
+        for g in self:
+            stats[g.order()] = stats.get(g.order(), 0) + 1
+        return stats
+
+    def exponent(self):
+        """
+        Returns the exponent of self: the least common multiple of the
+        orders of its elements, so that g ** n == g ** (n % exponent)
+        """
+        if self._exponent is None:
+            m = 1
+            for k in set(g.order() for g in self):
+                m = m * k // gcd(m, k)
+            self._exponent = m
+        return self._exponent
 
     def is_cyclic(self):
         """Checks if self is a cyclic Group"""
@@ -296,16 +1072,21 @@ class Group:
 
     def subgroups(self):
         """Returns the Set of self's subgroups"""
+        return Set(self.iter_subgroups())
 
-        old_sgs = Set([self.generate([self.e])])
-        while True:
-            new_sgs = old_sgs | Set(self.generate(list(sg.group_elems) + [g]) \
-                                     for sg in old_sgs for g in self \
-                                     if g not in sg.group_elems)
-            if new_sgs == old_sgs: break
-            else: old_sgs = new_sgs
+    def iter_subgroups(self):
+        """
+        Yields self's subgroups one at a time, without keeping them
 
-        return old_sgs
+        Like subgroup_lattice, this tabulates self.
+        """
+        return iter_subgroups(self)
+
+    def subgroup_lattice(self):
+        """
+        Returns the SubgroupLattice of self, tabulating self if need be
+        """
+        return SubgroupLattice(self)
 
     def generators(self):
         """
@@ -313,73 +1094,230 @@ class Group:
         at most log_2(len(self)) + 1
         """
 
-        result = [self.e.elem]
-        H = self.generate(result)
-
-        while len(H) < len(self):
-            result.append((self.Set - H.Set).pick())
-            H = self.generate(result)
-
         # The identity is always a redundant generator in nontrivial Groups
-        if len(self) != 1:
-            result = result[1:]
-
-        return [GroupElem(g, self) for g in result]
+        return [GroupElem(g, self) for g in self._gens() \
+                if len(self) == 1 or g != self.e.elem]
 
-    def find_isomorphism(self, other):
+    def find_isomorphism(self, other, workers=None, chunksize=None):
         """
         Returns an isomorphic GroupHomomorphism between self and other,
         or None if self and other are not isomorphic
 
         Uses Tarjan's algorithm, running in O(n^(log n + O(1))) time, but
         runs a lot faster than that if the group has a small generating set.
+        Groups with different fingerprints are rejected straight away, and
+        generators are only mapped to elements with the same order and
+        conjugacy class size. Both groups get tabulated.
+
+        Pass workers to split the candidate images of the generators over
+        that many processes, chunksize candidates at a time. The first
+        isomorphism that any of them finds is returned, and the rest are
+        stopped.
+        """
+        images = self._isomorphism_images(other, workers, chunksize)
+        try:
+            for image in images:
+                return self._index_homomorphism(other, image)
+            return None
+        finally:
+            images.close()
+
+    def all_isomorphisms(self, other, workers=None, chunksize=None):
+        """
+        Yields every isomorphism from self to other, as a GroupHomomorphism
+
+        workers and chunksize are as in find_isomorphism; with workers, the
+        isomorphisms come in the order that the processes find them.
         """
         if not isinstance(other, Group):
             raise TypeError("other must be a Group")
+        return (self._index_homomorphism(other, image) for image \
+                in self._isomorphism_images(other, workers, chunksize))
 
-        if len(self) != len(other) or self.is_abelian() != other.is_abelian():
-            return None
+    def automorphisms(self, workers=None, chunksize=None):
+        """Yields every automorphism of self, as a GroupHomomorphism"""
+        return self.all_isomorphisms(self, workers, chunksize)
 
-        # Try to match the generators of self with some subset of other
+    def _isomorphism_images(self, other, workers, chunksize):
+        """
+        Yields the index images, as in _extend_isomorphism, of the
+        isomorphisms from self to other
+
+        Each isomorphism is tried once, from the images of the generators of
+        self, and with workers the candidates are sent to a process pool in
+        batches of chunksize.
+        """
+        if not isinstance(other, Group):
+            raise TypeError("other must be a Group")
+
+        if len(self) != len(other) or self.fingerprint() != other.fingerprint():
+            return
+
+        # The image of each generator of self must have the same order and
+        # conjugacy class size. Match the generators on indices.
         A = self.generators()
-        for B in itertools.permutations(other, len(A)):
-
-            func = dict(itertools.izip(A, B)) # the mapping
-            counterexample = False
-            while not counterexample:
-
-                # Loop through the mapped elements so far, trying to extend the
-                # mapping or else find a counterexample
-                noobs = {}
-                for g, h in itertools.product(func, func):
-                    if g * h in func:
-                        if func[g] * func[h] != func[g * h]:
-                            counterexample = True
-                            break
-                    else: 
-                        noobs[g * h] = func[g] * func[h]
-
-                # If we've mapped all the elements of self, then it's a
-                # homomorphism provided we haven't seen any counterexamples.
-                if len(func) == len(self): 
-                    break
+        keys, other_keys = self._element_keys(), other._element_keys()
+        candidates = [[h for h in other if other_keys[h] == keys[g]] for g in A]
+        self.tabulate()
+        other.tabulate()
+        A = [self.table.index[g.elem] for g in A]
+        candidates = [[other.table.index[h.elem] for h in c] \
+                      for c in candidates]
+        Bs = (B for B in itertools.product(*candidates) \
+              if len(set(B)) == len(B))
+
+        if workers is None:
+            for B in Bs:
+                image = _extend_isomorphism(self.table, other.table, A, B)
+                if image is not None:
+                    yield image
+            return
+
+        if chunksize is None:
+            chunksize = 64
+        batches = iter(lambda: list(itertools.islice(Bs, chunksize)), [])
+        tables = (self.table, other.table, A)
+        for found in _pool_imap(_extend_isomorphisms, tables, batches, workers):
+            for image in found:
+                yield image
+
+    def _index_homomorphism(self, other, image):
+        """
+        Returns the GroupHomomorphism sending self.table index i to
+        other.table index image[i]
+        """
+        func = dict((self._by_index[i], other._by_index[j]) \
+                    for i, j in enumerate(image))
+        return _table_homomorphism(self, other, func)
+
+    def fingerprint(self):
+        """
+        Returns a hashable summary of invariants of self
+
+        Isomorphic groups have equal fingerprints, so groups can be bucketed
+        by fingerprint before looking for isomorphisms between them. The
+        fingerprint holds the order, whether self is abelian, the order
+        statistics, the size of the center, and the order and size of each
+        conjugacy class.
+        """
+        if self._fingerprint is None:
+            classes = self._conjugacy_classes()
+            self._fingerprint = (len(self), self.is_abelian(), \
+                tuple(sorted(self.order_statistics().iteritems())), \
+                len(self.center()), \
+                tuple(sorted((c[0].order(), len(c)) for c in classes)))
+        return self._fingerprint
+
+    def _element_keys(self):
+        """
+        Returns a dict from each GroupElem to its order and the size of its
+        conjugacy class, which any isomorphism has to preserve
+        """
+        classes = self._conjugacy_classes()
+        return dict((g, (g.order(), len(classes[i]))) \
+                    for g, i in self._class_of.iteritems())
+
+    def _conjugacy_classes(self):
+        """
+        Returns the list of conjugacy classes of self, as lists of GroupElems,
+        starting with the class of the identity, and records the number of
+        the class of each GroupElem in self._class_of
+
+        Every class is found in a single pass: each class is the orbit of an
+        element under conjugation by the generators, found by a breadth-first
+        search, which costs two products per element and generator.
+        """
+        if self._classes is None:
+            gens = self.generators()
+            conjugators = zip(gens, self.inverses(gens))
+            self._class_of = {}
+            self._classes = []
+            for g in self:
+                if g in self._class_of: continue
+                k = len(self._classes)
+                self._class_of[g] = k
+                orbit = [g]
+                for x in orbit:
+                    for s, t in conjugators:
+                        y = t * x * s
+                        if y not in self._class_of:
+                            self._class_of[y] = k
+                            orbit.append(y)
+                self._classes.append(orbit)
+        return self._classes
+
+    def conjugacy_classes(self):
+        """
+        Returns the list of conjugacy classes of self, as Sets of GroupElems,
+        starting with the class of the identity
+        """
+        return [Set(c) for c in self._conjugacy_classes()]
+
+    def conjugacy_class(self, g):
+        """Returns the conjugacy class of the GroupElem g, as a Set"""
+        if not g in self.group_elems:
+            raise TypeError("g isn't a GroupElem in the Group")
+        classes = self._conjugacy_classes()
+        return Set(classes[self._class_of[g]])
 
-                # Make sure there aren't any collisions before updating
-                imagelen = len(set(noobs.values()) | set(func.values()))
-                if imagelen != len(noobs) + len(func):
-                    counterexample = True
-                func.update(noobs)
+    def class_representatives(self):
+        """
+        Returns a list with a GroupElem from each conjugacy class, in the
+        order of conjugacy_classes
+        """
+        return [c[0] for c in self._conjugacy_classes()]
 
-            if not counterexample:
-                return GroupHomomorphism(self, other, lambda x: func[x])
+    def centralizer_orders(self):
+        """
+        Returns the list of orders of the centralizers of the
+        class_representatives, which are len(self) / the class sizes
+        """
+        return [len(self) // len(c) for c in self._conjugacy_classes()]
 
-        return None
+    def centralizer(self, g):
+        """Returns the subgroup of elements commuting with the GroupElem g"""
+        if not g in self.group_elems:
+            raise TypeError("g isn't a GroupElem in the Group")
+        g = self._elem(g.elem)
+        return self._subgroup(Set(h.elem for h in self if g * h == h * g))
+
+    def center(self):
+        """Returns the center of self, the union of its classes of size 1"""
+        if self._center is None:
+            self._center = self._subgroup(Set(c[0].elem for c in \
+                                              self._conjugacy_classes() \
+                                              if len(c) == 1))
+        return self._center
 
     def is_isomorphic(self, other):
         """Checks if self and other are isomorphic"""
         return bool(self.find_isomorphism(other))
 
 
+def isomorphism_classes(groups):
+    """
+    Returns a list of lists, splitting groups up by isomorphism
+
+    The groups are bucketed by fingerprint first, so only groups with the
+    same fingerprint are ever compared.
+    """
+    buckets = {}
+    for G in groups:
+        buckets.setdefault(G.fingerprint(), []).append(G)
+    classes = []
+    for bucket in buckets.itervalues():
+        reps = []
+        for G in bucket:
+            for c in reps:
+                if G.is_isomorphic(c[0]):
+                    c.append(G)
+                    break
+            else:
+                reps.append([G])
+        classes.extend(reps)
+    return classes
+
+
 class GroupHomomorphism(Function):
     """
     The definition of a Group Homomorphism
@@ -388,65 +1326,194 @@ class GroupHomomorphism(Function):
     homomorphism axioms.
     """
 
-    def __init__(self, domain, codomain, function):
-        """Check types and the homomorphism axioms; records the two groups"""
+    def __init__(self, domain, codomain, function, trusted=False, \
+                 workers=None, chunksize=None):
+        """
+        Check types and the homomorphism axioms; records the two groups
+
+        Pass trusted=True to skip checking the axioms, for homomorphisms
+        which are correct by construction. Pass workers to check them in
+        parallel instead, on the Cayley tables of the two groups, split over
+        that many processes chunksize rows at a time; the homomorphism is
+        then left tabulated.
+        """
 
         if not isinstance(domain, Group):
             raise TypeError("domain must be a Group")
         if not isinstance(codomain, Group):
             raise TypeError("codomain must be a Group")
+
+        self.domain = domain
+        self.codomain = codomain
+        self.function = function
+        self._table = None
+        self._fiber_index = None
+        if trusted:
+            return
+
         if not all(function(elem) in codomain for elem in domain):
             raise TypeError("Function returns some value outside of codomain")
 
+        if workers is not None:
+            dtable = domain.tabulate().table
+            ctable = codomain.tabulate().table
+            images = [ctable.index[function(g).elem] for g in domain._by_index]
+            if homomorphism_counterexample(dtable, ctable, images, workers, \
+                                           chunksize) is not None:
+                raise ValueError("function doesn't satisfy the homomorphism " \
+                                 "axioms")
+            self._table = dict((g, codomain._by_index[i]) \
+                               for g, i in zip(domain._by_index, images))
+            return
+
         if not all(function(a * b) == function(a) * function(b) \
                    for a, b in itertools.product(domain, domain)):
             raise ValueError("function doesn't satisfy the homomorphism axioms")
 
-        self.domain = domain
-        self.codomain = codomain
-        self.function = function
-
     def kernel(self):
         """Returns the kernel of the homomorphism as a Group object"""
-        G = Set(g.elem for g in self.domain if self(g) == self.codomain.e)
-        return Group(G, self.domain.bin_op.new_domains(G * G, G))
+        G = Set(g.elem for g in self.preimage(self.codomain.e))
+        return self.domain._subgroup(G)
 
     def image(self):
         """Returns the image of the homomorphism as a Group object"""
         G = Set(g.elem for g in self._image())
-        return Group(G, self.codomain.bin_op.new_domains(G * G, G))
+        return self.codomain._subgroup(G)
 
     def is_isomorphism(self):
         return self.is_bijective()
 
 
+def _table_homomorphism(domain, codomain, table):
+    """
+    Returns the GroupHomomorphism given by table, a dict from each GroupElem
+    of domain to a GroupElem of codomain, which must be a homomorphism
+    """
+    f = GroupHomomorphism(domain, codomain, lambda x: table[x], trusted=True)
+    f._table = table
+    return f
+
+def extend_homomorphism(domain, codomain, images):
+    """
+    Returns the GroupHomomorphism from domain to codomain that sends each
+    key of the dict images to its value
+
+    The keys must generate domain. The map is extended by a breadth-first
+    search of the Cayley graph of domain, with f(x * s) = f(x) * f(s) for
+    each generator s, and it's a homomorphism if and only if that's
+    consistent on every edge, since every element is a product of
+    generators. That takes len(images) products per element of domain,
+    rather than a product for every pair of elements. The result is a
+    lookup table.
+    """
+    if not isinstance(domain, Group):
+        raise TypeError("domain must be a Group")
+    if not isinstance(codomain, Group):
+        raise TypeError("codomain must be a Group")
+    pairs = []
+    for s, t in images.iteritems():
+        s = s.elem if isinstance(s, GroupElem) else s
+        t = t.elem if isinstance(t, GroupElem) else t
+        pairs.append((GroupElem(s, domain), GroupElem(t, codomain)))
+
+    table = {domain.e: codomain.e}
+    queue = [domain.e]
+    for x in queue:
+        fx = table[x]
+        for s, t in pairs:
+            y = x * s
+            fy = fx * t
+            if y not in table:
+                table[y] = fy
+                queue.append(y)
+            elif table[y] is not fy:
+                raise ValueError("images don't extend to a homomorphism")
+    if len(table) != len(domain):
+        raise ValueError("the keys of images must generate domain")
+    return _table_homomorphism(domain, codomain, table)
+
 def Zn(n):
     """Returns the cylic group of order n"""
     G = Set(range(n))
-    bin_op = Function(G * G, G, lambda x: (x[0] + x[1]) % n)
-    return Group(G, bin_op)
+    bin_op = Function(CartesianProduct(G, G), G, lambda x: (x[0] + x[1]) % n, \
+                      check=False)
+    return Group(G, bin_op, trusted=True)
 
 def Sn(n):
     """Returns the symmetric group of order n! """
     G = Set(g for g in itertools.permutations(range(n)))
-    bin_op = Function(G * G, G, lambda x: tuple(x[0][j] for j in x[1]))
-    return Group(G, bin_op)
+    bin_op = Function(CartesianProduct(G, G), G, \
+                      lambda x: tuple(x[0][j] for j in x[1]), check=False)
+    return Group(G, bin_op, trusted=True)
 
 def Dn(n):
     """Returns the dihedral group of order 2n """
-    G = Set("%s%d" % (l, x) for l in "RS" for x in xrange(n))
-    def multiply_symmetries(x):
-        l1, l2 = x[0][0], x[1][0]
-        x1, x2 = int(x[0][1:]), int(x[1][1:])
-        if l1 == "R":
-            if l2 == "R":
-                return "R%d" % ((x1 + x2) % n)
-            else:
-                return "S%d" % ((x1 + x2) % n)
-        else:
-            if l2 == "R":
-                return "S%d" % ((x1 - x2) % n)
-            else:
-                return "R%d" % ((x1 - x2) % n)
-    return Group(G, Function(G * G, G, multiply_symmetries))
+    # <r, s | r^n, s^2, (rs)^2>, naming r**a as "Ra" and r**a * s as "Sa"
+    C = CosetEnumeration("rs", ["r" * n, "ss", "rsrs"])
+    labels = [None] * len(C)
+    for a in xrange(n):
+        labels[C.coset("r" * a)] = "R%d" % a
+        labels[C.coset("r" * a + "s")] = "S%d" % a
+    return CayleyGroup(C.cayley_table(labels))
+
+def DirectProduct(*groups):
+    """
+    Returns the direct product of groups, whose elements are tuples with an
+    element of each group
+
+    Factors which are themselves DirectProducts are flattened, so the
+    elements of (G * H) * K are (g, h, k). Nothing is checked: the identity,
+    inverses, generators and whether the product is abelian all come from
+    the factors, and products are computed componentwise with the factors'
+    own functions.
+    """
+    factors = []
+    for G in groups:
+        if not isinstance(G, Group):
+            raise TypeError("groups must be Groups")
+        factors.extend(G._factors or [G])
+
+    ops = [H.bin_op.function for H in factors]
+    def multiply(x):
+        return tuple(op((a, b)) for op, a, b in itertools.izip(ops, x[0], x[1]))
+
+    G = Set(itertools.product(*[H.Set for H in factors]))
+    P = Group(G, Function(CartesianProduct(G, G), G, multiply, check=False), \
+              trusted=True)
+    P._factors = factors
+
+    e = tuple(H.e.elem for H in factors)
+    P._e = P._elem(e)
+    P._abelian = all(H.is_abelian() for H in factors)
+    P._generators = [e[:i] + (s,) + e[i + 1:] for i, H in enumerate(factors) \
+                     for s in H._gens() if s != e[i]] or [e]
+    inverses = [H._inverse_map() for H in factors]
+    P._inverses = dict((x, tuple(inv[a] for inv, a in \
+                                 itertools.izip(inverses, x))) for x in G)
+    return P
+
+def CayleyGroup(table):
+    """
+    Returns the Group with CayleyTable table, whose element 0 must be the
+    identity
+    """
+    G = Set(table.elems)
+    bin_op = Function(CartesianProduct(G, G), G, table, check=False)
+    group = Group(G, bin_op, trusted=True)
+    group.table = table
+    group._by_index = [group._elem(g) for g in table.elems]
+    group._e = group._by_index[0]
+    return group
+
+def PresentedGroup(gens, relators, max_cosets=1000000, max_time=None):
+    """
+    Returns the finite group with generators gens and relators, as in
+    CosetEnumeration, with its Cayley table built by coset enumeration
 
+    The elements are shortest words in the generators, with the identity as
+    "e". Raises RuntimeError if the enumeration needs more than max_cosets
+    cosets or max_time seconds.
+    """
+    C = CosetEnumeration(gens, relators, max_cosets=max_cosets, \
+                         max_time=max_time)
+    return CayleyGroup(C.cayley_table())
@@ -0,0 +1,224 @@
+"""
+Implementation of permutation groups given by generators
+"""
+
+import random
+
+from Set import Set, CartesianProduct
+from Function import Function
+from Group import Group
+
+def _mul(p, q):
+    """Returns the permutation p * q, which applies q first, like in Sn"""
+    return tuple(p[j] for j in q)
+
+def _inv(p):
+    """Returns the inverse of the permutation p"""
+    result = [0] * len(p)
+    for i, j in enumerate(p):
+        result[j] = i
+    return tuple(result)
+
+def _moved_point(p):
+    """Returns the first point that p moves, or None if p is the identity"""
+    for i, j in enumerate(p):
+        if i != j:
+            return i
+    return None
+
+class PermutationGroup:
+    """
+    Definition of a group of permutations of range(degree), given by
+    generators
+
+    Permutations are tuples, like the elements of Sn(degree), and p * q
+    applies q first. Rather than listing its elements, a PermutationGroup
+    keeps a base and strong generating set, built by the Schreier-Sims
+    algorithm, so that its order, membership tests and random elements only
+    cost polynomial time in the degree.
+    """
+
+    def __init__(self, gens, degree=None):
+        """Check that gens are permutations, and run Schreier-Sims"""
+        gens = [tuple(g) for g in gens]
+        if degree is None:
+            if not gens:
+                raise ValueError("degree is needed if there are no generators")
+            degree = len(gens[0])
+        for g in gens:
+            if sorted(g) != range(degree):
+                raise TypeError("generators must be permutations of " \
+                                "range(degree)")
+
+        self.degree = degree
+        self.identity = tuple(range(degree))
+        self.gens = gens
+        self._schreier_sims([g for g in gens if g != self.identity])
+
+    def _orbit(self, i):
+        """
+        Recomputes the orbit of base[i] under the strong generators of level
+        i, as a dict from each point x to a transversal element u with
+        u[base[i]] == x
+        """
+        b = self.base[i]
+        transversal = {b: self.identity}
+        queue = [b]
+        for x in queue:
+            for s in self._strong[i]:
+                y = s[x]
+                if y not in transversal:
+                    transversal[y] = _mul(s, transversal[x])
+                    queue.append(y)
+        self._transversals[i] = transversal
+
+    def _strip(self, g, start=0):
+        """
+        Sifts g through the stabilizer chain from level start
+
+        Returns the residue and the level where sifting stopped, which is
+        len(self.base) if g made it through every level.
+        """
+        for i in xrange(start, len(self.base)):
+            u = self._transversals[i].get(g[self.base[i]])
+            if u is None:
+                return g, i
+            g = _mul(_inv(u), g)
+        return g, len(self.base)
+
+    def _schreier_sims(self, gens):
+        """Builds the base and strong generating set for the group of gens"""
+        self.base = []
+        self._strong = []
+        self._transversals = []
+
+        def extend_base(g):
+            self.base.append(_moved_point(g))
+            self._strong.append([])
+            self._transversals.append(None)
+
+        # Every generator has to move some base point
+        for g in gens:
+            if all(g[b] == b for b in self.base):
+                extend_base(g)
+        for i in xrange(len(self.base)):
+            self._strong[i] = [g for g in gens \
+                               if all(g[b] == b for b in self.base[:i])]
+            self._orbit(i)
+
+        i = len(self.base) - 1
+        while i >= 0:
+            restart = False
+            transversal = self._transversals[i]
+            for x, u in transversal.items():
+                for s in self._strong[i]:
+                    # The Schreier generator, which fixes base[i]
+                    h = _mul(_inv(transversal[s[x]]), _mul(s, u))
+                    if h == self.identity:
+                        continue
+                    h, j = self._strip(h, i + 1)
+                    if j == len(self.base):
+                        if h == self.identity:
+                            continue
+                        extend_base(h)
+                    for l in xrange(i + 1, j + 1):
+                        self._strong[l].append(h)
+                        self._orbit(l)
+                    i = j
+                    restart = True
+                    break
+                if restart: break
+            if not restart:
+                i -= 1
+
+    def strong_generators(self):
+        """Returns the list of strong generators, from every level"""
+        result = []
+        for strong in self._strong:
+            result.extend(g for g in strong if g not in result)
+        return result
+
+    def order(self):
+        """Returns the number of elements of self"""
+        result = 1
+        for transversal in self._transversals:
+            result *= len(transversal)
+        return result
+
+    def __len__(self):
+        return self.order()
+
+    def __contains__(self, perm):
+        perm = tuple(perm)
+        if len(perm) != self.degree or sorted(perm) != range(self.degree):
+            return False
+        g, i = self._strip(perm)
+        return g == self.identity
+
+    def random_element(self, rng=random):
+        """Returns a uniformly random element of self"""
+        g = self.identity
+        for transversal in reversed(self._transversals):
+            g = _mul(rng.choice(transversal.values()), g)
+        return g
+
+    def stabilizer_chain(self):
+        """
+        Returns a list with an entry (base point, orbit, generators) for each
+        level i of the stabilizer chain
+
+        The generators generate the stabilizer of the first i base points,
+        and orbit is the orbit of the i-th base point under them.
+        """
+        return [(b, Set(transversal), list(strong)) for b, transversal, strong \
+                in zip(self.base, self._transversals, self._strong)]
+
+    def stabilizer(self, i):
+        """
+        Returns the PermutationGroup fixing the first i points of the base
+        """
+        if i < len(self.base):
+            return PermutationGroup(self._strong[i], self.degree)
+        return PermutationGroup([], self.degree)
+
+    def __iter__(self):
+        """Iterate over the elements of self, without storing them"""
+        def elements(i):
+            if i == len(self.base):
+                yield self.identity
+                return
+            for g in elements(i + 1):
+                for u in self._transversals[i].itervalues():
+                    yield _mul(u, g)
+        return elements(0)
+
+    def to_group(self, max_order=5040):
+        """
+        Returns self as a Group, with the same binary operation as Sn
+
+        Raises ValueError if self has more than max_order elements.
+        """
+        if self.order() > max_order:
+            raise ValueError("group has more than max_order elements")
+        G = Set(self)
+        bin_op = Function(CartesianProduct(G, G), G, \
+                          lambda x: tuple(x[0][j] for j in x[1]), check=False)
+        return Group(G, bin_op, trusted=True)
+
+def Sym(n):
+    """Returns the symmetric group on range(n), as a PermutationGroup"""
+    if n < 2:
+        return PermutationGroup([], n)
+    return PermutationGroup([(1, 0) + tuple(range(2, n)), \
+                             tuple(range(1, n)) + (0,)])
+
+def Alt(n):
+    """Returns the alternating group on range(n), as a PermutationGroup"""
+    if n < 3:
+        return PermutationGroup([], n)
+    gens = []
+    for k in xrange(2, n):
+        g = range(n)
+        g[0], g[1], g[k] = 1, k, 0
+        gens.append(tuple(g))
+    return PermutationGroup(gens)
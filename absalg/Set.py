@@ -24,3 +24,59 @@ class Set(frozenset):
 
         for item in self: break
         return item
+
+class CartesianProduct(object):
+    """
+    Definition of a virtual Cartesian product of two Sets
+
+    It answers membership, len, iteration and equality from its two factors,
+    without ever building the set of pairs, so the domain of a binary
+    operation on a Set of n elements takes O(1) memory rather than n**2
+    tuples.
+    """
+    def __init__(self, left, right):
+        if not isinstance(left, (Set, CartesianProduct)) or \
+           not isinstance(right, (Set, CartesianProduct)):
+            raise TypeError("One of the objects is not a set")
+        self.left = left
+        self.right = right
+        self._hash = None
+
+    def __contains__(self, item):
+        if not isinstance(item, tuple) or len(item) != 2:
+            return False
+        return item[0] in self.left and item[1] in self.right
+
+    def __len__(self):
+        return len(self.left) * len(self.right)
+
+    def __iter__(self):
+        right = self.right
+        return ((x, y) for x in self.left for y in right)
+
+    def __eq__(self, other):
+        if isinstance(other, CartesianProduct):
+            if len(self) == 0 or len(other) == 0:
+                return len(self) == len(other)
+            return self.left == other.left and self.right == other.right
+        if isinstance(other, frozenset):
+            return len(self) == len(other) and all(x in self for x in other)
+        return False
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        """
+        Returns the hash of the equivalent Set
+
+        This has to agree with the hash of an equal Set, so unlike everything
+        else here it does build the pairs, once, and only if it's asked for.
+        """
+        if self._hash is None:
+            self._hash = hash(Set(self))
+        return self._hash
+
+    def __mul__(self, other):
+        """Cartesian product"""
+        return CartesianProduct(self, other)
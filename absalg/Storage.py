@@ -0,0 +1,292 @@
+"""
+Implementation of saving groups to disk, and a catalog of saved groups
+"""
+
+import ast
+import ctypes
+import errno
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+from array import array
+
+from CayleyTable import CayleyTable, _typecode
+from Group import Group, CayleyGroup
+from Set import Set
+
+_MAGIC = "ABSALG\x00\x01"
+_CTYPES = {"B": ctypes.c_uint8, "H": ctypes.c_uint16, "l": ctypes.c_long}
+
+def _table_offset(header_size):
+    """The offset of the table in a file, aligned to 8 bytes"""
+    return (len(_MAGIC) + 8 + header_size + 7) // 8 * 8
+
+# The types that ast.literal_eval reads back from their repr
+_LITERALS = (type(None), bool, int, long, float, complex, str, unicode)
+
+def _to_literal(x):
+    """
+    Returns x with every Set and frozenset in it replaced by a dict, so that
+    its repr can be read back by ast.literal_eval
+
+    Raises TypeError if x holds anything else without a literal repr.
+    """
+    if type(x) in _LITERALS:
+        return x
+    if type(x) in (tuple, list):
+        return type(x)(_to_literal(y) for y in x)
+    if type(x) in (Set, frozenset):
+        items = sorted((_to_literal(y) for y in x), key=repr)
+        return {type(x).__name__: items}
+    raise TypeError("%r can't be saved" % (x,))
+
+def _from_literal(x):
+    """Inverts _to_literal"""
+    if isinstance(x, (tuple, list)):
+        return type(x)(_from_literal(y) for y in x)
+    if isinstance(x, dict):
+        (name, items), = x.items()
+        return {"Set": Set, "frozenset": frozenset}[name](
+            _from_literal(y) for y in items)
+    return x
+
+def save_group(group, path):
+    """
+    Saves group to the file path, which is replaced atomically
+
+    The file holds a header, with the elements, the inverse of each element
+    and the cached invariants of group, followed by its Cayley table as raw
+    machine ints, so that load_group can map the table straight from the
+    file. The header is written as a repr, so loading a file never runs
+    code from it, and the elements must be built from ints, strings and the
+    like, tuples, lists and Sets; raises TypeError otherwise. Group gets
+    tabulated.
+    """
+    if not isinstance(group, Group):
+        raise TypeError("group must be a Group")
+    table = group.tabulate().table
+    n = len(table)
+    typecode = _typecode(n)
+    index = table.index
+    inverses = group._inverse_map()
+    header = repr(sorted(_to_literal({
+        "elems": table.elems,
+        "typecode": typecode,
+        "itemsize": ctypes.sizeof(_CTYPES[typecode]),
+        "byteorder": sys.byteorder,
+        "inverses": [index[inverses[x]] for x in table.elems],
+        "generators": [index[x] for x in group._gens()],
+        "abelian": group.is_abelian(),
+        "fingerprint": group.fingerprint(),
+        "orders": [g._order for g in group._by_index],
+    }.items())))
+    data = table.data
+    if not isinstance(data, array) or data.typecode != typecode:
+        data = array(typecode, data)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_MAGIC)
+            f.write(struct.pack("<Q", len(header)))
+            f.write(header)
+            f.write("\0" * (_table_offset(len(header)) - f.tell()))
+            f.write(data.tostring())
+        os.rename(tmp, path)
+    except:
+        os.remove(tmp)
+        raise
+
+def _read(path):
+    """
+    Returns the header of the file path, and its CayleyTable, with the data
+    mapped from the file
+    """
+    with open(path, "rb") as f:
+        if f.read(len(_MAGIC)) != _MAGIC:
+            raise ValueError("%s isn't a saved group" % path)
+        size, = struct.unpack("<Q", f.read(8))
+        try:
+            header = dict(_from_literal(ast.literal_eval(f.read(size))))
+        except (SyntaxError, ValueError, TypeError, KeyError):
+            raise ValueError("%s has a corrupt header" % path)
+        # ACCESS_COPY, since ctypes needs a writable buffer; the pages are
+        # still shared between processes, since they're never written
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+    ctype = _CTYPES[header["typecode"]]
+    if header["byteorder"] != sys.byteorder or \
+       header["itemsize"] != ctypes.sizeof(ctype):
+        raise ValueError("%s was saved on an incompatible machine" % path)
+    n = len(header["elems"])
+    try:
+        data = (ctype * (n * n)).from_buffer(mapped, _table_offset(size))
+    except ValueError:
+        raise ValueError("%s is truncated" % path)
+    table = CayleyTable(header["elems"], data)
+    table._source = (load_table, (path,))
+    return header, table
+
+def load_table(path):
+    """
+    Returns the CayleyTable saved in the file path
+
+    The table's data is a memory map of the file, so processes that load the
+    same file share one copy of it, and pickling the table only pickles
+    path.
+    """
+    return _read(path)[1]
+
+def load_group(path):
+    """
+    Returns the Group saved in the file path by save_group
+
+    The group is tabulated, with its table mapped from the file as in
+    load_table, and its inverses and invariants come from the file too, so
+    nothing about it is recomputed.
+    """
+    header, table = _read(path)
+    group = CayleyGroup(table)
+    elems = table.elems
+    group._inverses = dict((x, elems[i]) for x, i \
+                           in zip(elems, header["inverses"]))
+    group._generators = [elems[i] for i in header["generators"]]
+    group._abelian = header["abelian"]
+    group._fingerprint = header["fingerprint"]
+    for g, order in zip(group._by_index, header["orders"]):
+        g._order = order
+    return group
+
+def _stable_key(x):
+    """
+    Returns a key for x whose repr is the same in every process, for
+    naming files
+
+    Groups are keyed by a digest of their elements and Cayley table, with
+    the elements in a canonical order, so equal Groups get equal keys.
+    Raises TypeError for anything else without a stable repr, such as
+    objects whose repr is their address.
+    """
+    if x is None or isinstance(x, (bool, int, long, float, str, unicode)):
+        return x
+    if isinstance(x, (tuple, list)):
+        return (type(x).__name__,) + tuple(_stable_key(y) for y in x)
+    if isinstance(x, (frozenset, set)):
+        keys = sorted((_stable_key(y) for y in x), key=repr)
+        return (type(x).__name__,) + tuple(keys)
+    if isinstance(x, Group):
+        table = x.tabulate().table
+        keys = [repr(_stable_key(g)) for g in table.elems]
+        order = sorted(xrange(len(table)), key=keys.__getitem__)
+        data = table.renumber(order).data
+        digest = hashlib.sha1("\0".join(keys[i] for i in order))
+        digest.update(array(_typecode(len(table)), data).tostring())
+        return ("Group", digest.hexdigest())
+    raise TypeError("%r has no stable key; pass key= to Catalog.get" % (x,))
+
+class Catalog:
+    """
+    Definition of a directory of saved groups
+
+    Groups are saved either under the constructor and arguments that built
+    them, so that get(Sn, 5) only builds Sn(5) the first time it's called
+    with that directory, or under their fingerprint, so that add(G) keeps
+    one group from each isomorphism class. Constructors are identified by
+    their module and name, so they must be module level functions.
+    """
+
+    def __init__(self, directory):
+        """Record the directory, creating it if need be"""
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        self.directory = directory
+
+    def _path(self, prefix, key):
+        """The path of the file for the key, which must have a stable repr"""
+        digest = hashlib.sha1(repr(key)).hexdigest()
+        return os.path.join(self.directory, "%s-%s.group" % (prefix, digest))
+
+    def get(self, constructor, *args, **kwargs):
+        """
+        Returns the group constructor(*args), loading it if it's been saved,
+        and otherwise building and saving it
+
+        The group is saved under the module and name of constructor, and the
+        args, where Group args are keyed by their elements and Cayley table.
+        Pass key= to key it by that instead of args, which is needed for
+        args without a stable repr. Raises TypeError if constructor isn't a
+        module level function or class, since lambdas and nested functions
+        can't be told apart by name.
+        """
+        key = kwargs.pop("key", None)
+        if kwargs:
+            raise TypeError("unexpected keyword arguments %s" % kwargs.keys())
+        module = getattr(constructor, "__module__", None)
+        name = getattr(constructor, "__name__", None)
+        if module is None or name is None or \
+           getattr(sys.modules.get(module), name, None) is not constructor:
+            raise TypeError("constructor must be a module level function")
+
+        key = _stable_key(args if key is None else ("key", key))
+        path = self._path(name, (module, name, key))
+        if os.path.exists(path):
+            return load_group(path)
+        group = constructor(*args)
+        save_group(group, path)
+        return group
+
+    def _load_slot(self, path):
+        """
+        Loads the group at path, waiting for it to be written if another
+        process has just claimed it in add
+        """
+        while os.path.getsize(path) == 0:
+            time.sleep(0.01)
+        return load_group(path)
+
+    def matching(self, fingerprint):
+        """
+        Returns the list of groups added to self with the given fingerprint
+        """
+        groups = []
+        while True:
+            path = self._path("fingerprint", (fingerprint, len(groups)))
+            if not os.path.exists(path):
+                return groups
+            groups.append(self._load_slot(path))
+
+    def add(self, group):
+        """
+        Returns the group in self isomorphic to group, adding group to self
+        if there isn't one yet
+
+        Groups with the same fingerprint go in numbered slots, and a slot is
+        claimed by creating its file exclusively before group is saved to
+        it, so processes adding to the same directory at once never
+        overwrite each other's groups.
+        """
+        fingerprint = group.fingerprint()
+        i = 0
+        while True:
+            path = self._path("fingerprint", (fingerprint, i))
+            try:
+                os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            except OSError as e:
+                if e.errno != errno.EEXIST:
+                    raise
+                H = self._load_slot(path)
+                if group.is_isomorphic(H):
+                    return H
+                i += 1
+                continue
+            try:
+                save_group(group, path)
+            except:
+                os.remove(path)
+                raise
+            return group
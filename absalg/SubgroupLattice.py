@@ -0,0 +1,114 @@
+"""
+Implementation of subgroup lattices
+"""
+
+import collections
+
+from BitSet import BitSet
+
+def iter_subgroup_masks(group):
+    """
+    Yields a pair (mask, gens) for each subgroup of group
+
+    mask is the bitmask of the indices of the subgroup's elements in
+    group.table, which this builds if need be, and gens is a list of indices
+    that generate it. The subgroups come from the cyclic subgroups and their
+    joins: every subgroup is generated by the cyclic subgroups it contains,
+    so joining each new subgroup with each cyclic subgroup not already in it
+    finds them all. Only the masks seen so far are kept in memory.
+    """
+    table = group.tabulate().table
+    mul = table.mul
+
+    # The cyclic subgroups, walking the powers of each element
+    cyclic = {}
+    for g in xrange(len(table)):
+        mask = 1
+        x = g
+        while x != 0:
+            mask |= 1 << x
+            x = mul(x, g)
+        cyclic.setdefault(mask, g)
+    cyclic = sorted(cyclic.iteritems())
+
+    seen = set([1])
+    yield 1, []
+    queue = collections.deque()
+    for mask, g in cyclic:
+        if mask not in seen:
+            seen.add(mask)
+            queue.append((mask, [g]))
+            yield mask, [g]
+
+    while queue:
+        mask, gens = queue.popleft()
+        for cmask, g in cyclic:
+            if cmask & ~mask == 0:
+                continue
+            join = gens + [g]
+            jmask = BitSet.from_indices(table, table.closure(join)).mask
+            if jmask not in seen:
+                seen.add(jmask)
+                queue.append((jmask, join))
+                yield jmask, join
+
+def iter_subgroups(group):
+    """Yields the subgroups of group, as Groups, one at a time"""
+    table = group.tabulate().table
+    for mask, gens in iter_subgroup_masks(group):
+        yield group._index_subgroup(BitSet(table, mask).indices())
+
+class SubgroupLattice:
+    """
+    Definition of the lattice of subgroups of a finite Group
+
+    The subgroups are listed in order of increasing size, and subgroups[i]
+    has element bitmask masks[i], elements subsets[i] as a BitSet of
+    group.table, index index[i] in the group, and is normal if normal[i] is
+    True. edges lists the pairs (i, j) where subgroups[i] is
+    a maximal subgroup of subgroups[j].
+    """
+
+    def __init__(self, group):
+        """Find every subgroup of group, and how they contain each other"""
+        self.group = group
+        found = sorted(iter_subgroup_masks(group), \
+                       key=lambda x: (bin(x[0]).count("1"), x[0]))
+        self.masks = [mask for mask, gens in found]
+        self.subsets = [BitSet(group.table, mask) for mask in self.masks]
+        self.subgroups = [group._index_subgroup(subset.indices()) \
+                          for subset in self.subsets]
+        self.index = [len(group) // len(H) for H in self.subgroups]
+
+        # H is normal if conjugating its generators by the generators of
+        # the group stays in H
+        table = group.table
+        mul = table.mul
+        gens = [table.index[s.elem] for s in group.generators()]
+        conjugators = [(s, table.row(s).index(0)) for s in gens]
+        self.normal = [all(mask >> mul(mul(t, h), s) & 1 \
+                           for s, t in conjugators for h in conj_gens) \
+                       for mask, conj_gens in found]
+
+        # Covering relations, from containment of the masks
+        self.edges = []
+        for j, big in enumerate(self.masks):
+            below = [i for i in xrange(j) if self.masks[i] & ~big == 0 \
+                     and self.masks[i] != big]
+            self.edges.extend((i, j) for i in below \
+                              if not any(self.masks[i] & ~self.masks[k] == 0 \
+                                         for k in below if k != i))
+
+    def __len__(self):
+        return len(self.subgroups)
+
+    def __iter__(self):
+        return iter(self.subgroups)
+
+    def contains(self, i, j):
+        """Checks if subgroups[i] is a subgroup of subgroups[j]"""
+        return self.subsets[i] <= self.subsets[j]
+
+    def maximal_subgroups(self, j):
+        """Returns the indices of the maximal subgroups of subgroups[j]"""
+        return [a for a, b in self.edges if b == j]
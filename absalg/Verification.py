@@ -0,0 +1,129 @@
+"""
+Implementation of axiom checks on Cayley tables, optionally in parallel
+"""
+
+import collections
+import itertools
+import multiprocessing
+
+# The tables of the check being run, set in each worker process by _init
+_tables = None
+
+def _init(tables):
+    """Records the tables in a worker process, so tasks only send rows"""
+    global _tables
+    _tables = tables
+
+def _run(task):
+    """Runs a check on a chunk of rows, with the tables of this worker"""
+    check, rows = task
+    return check(_tables, rows)
+
+def _associative_rows(tables, rows):
+    """
+    Returns a triple of indices (a, b, c) with (a * b) * c != a * (b * c),
+    for a in rows and b in the middle elements, or None if there isn't one
+    """
+    table, middle = tables
+    data, n = table.data, table.n
+    for a in rows:
+        for b in middle:
+            ab = data[a * n + b] * n
+            for c in xrange(n):
+                if data[ab + c] != data[a * n + data[b * n + c]]:
+                    return a, b, c
+    return None
+
+def _homomorphic_rows(tables, rows):
+    """
+    Returns a pair of indices (a, b) with f(a * b) != f(a) * f(b), for a in
+    rows, or None if there isn't one
+    """
+    domain, codomain, images = tables
+    data, n = domain.data, domain.n
+    cdata, m = codomain.data, codomain.n
+    for a in rows:
+        fa = images[a] * m
+        for b in xrange(n):
+            if images[data[a * n + b]] != cdata[fa + images[b]]:
+                return a, b
+    return None
+
+def _pool_imap(check, tables, tasks, workers):
+    """
+    Yields check(tables, task) for each of tasks, in order
+
+    The tasks run on a multiprocessing.Pool of workers processes, each with
+    its own copy of tables, which is stopped when the generator is finished
+    or closed. At most 2 * workers tasks are sent ahead of the result being
+    yielded, so tasks can be a long or endless iterator.
+    """
+    pool = multiprocessing.Pool(workers, _init, (tables,))
+    try:
+        tasks = iter(tasks)
+        pending = collections.deque()
+        for task in itertools.islice(tasks, 2 * workers):
+            pending.append(pool.apply_async(_run, ((check, task),)))
+        while pending:
+            result = pending.popleft().get()
+            for task in itertools.islice(tasks, 1):
+                pending.append(pool.apply_async(_run, ((check, task),)))
+            yield result
+    finally:
+        pool.terminate()
+        pool.join()
+
+def _first_counterexample(check, tables, n, workers, chunksize):
+    """
+    Runs check on chunks of the rows 0..n-1, and returns the first
+    counterexample found, or None
+
+    With workers=None, the check runs in this process. Otherwise the chunks
+    are split over workers processes, which are stopped as soon as any
+    chunk turns up a counterexample.
+    """
+    if workers is None:
+        return check(tables, xrange(n))
+    if chunksize is None:
+        chunksize = max(1, n // (4 * workers))
+    chunks = [xrange(i, min(i + chunksize, n)) \
+              for i in xrange(0, n, chunksize)]
+    results = _pool_imap(check, tables, chunks, workers)
+    try:
+        for result in results:
+            if result is not None:
+                return result
+        return None
+    finally:
+        results.close()
+
+def associativity_counterexample(table, middle=None, workers=None, \
+                                 chunksize=None):
+    """
+    Returns a triple of indices (a, b, c) of table with (a * b) * c !=
+    a * (b * c), or None if there isn't one
+
+    Only the b in middle are tried, which is every index by default. By
+    Light's test, the indices of a generating set are enough. workers and
+    chunksize are the number of processes and the number of values of a
+    given to each at a time, as in _first_counterexample.
+    """
+    if middle is None:
+        middle = range(len(table))
+    tables = (table, list(middle))
+    return _first_counterexample(_associative_rows, tables, len(table), \
+                                 workers, chunksize)
+
+def homomorphism_counterexample(domain, codomain, images, workers=None, \
+                                chunksize=None):
+    """
+    Returns a pair of indices (a, b) of the CayleyTable domain with
+    f(a * b) != f(a) * f(b), or None if there isn't one
+
+    f is the function on indices with f(a) == images[a], an index of the
+    CayleyTable codomain. workers and chunksize are as in
+    associativity_counterexample.
+    """
+    tables = (domain, codomain, list(images))
+    return _first_counterexample(_homomorphic_rows, tables, len(domain), \
+                                 workers, chunksize)
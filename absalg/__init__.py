@@ -2,5 +2,21 @@ import Set
 from Set import *
 import Function
 from Function import *
+import CayleyTable
+from CayleyTable import *
+import BitSet
+from BitSet import *
+import CosetEnumeration
+from CosetEnumeration import *
+import Cosets
+from Cosets import *
+import SubgroupLattice
+from SubgroupLattice import *
+import Verification
+from Verification import *
 import Group
 from Group import *
+import PermutationGroup
+from PermutationGroup import *
+import Storage
+from Storage import *
@@ -0,0 +1,75 @@
+"""
+Memory benchmark for GroupElem on Sn(5)
+
+Computes every product g * h in Sn(5), and keeps the results alive, as a
+subgroup search does. "before" runs the workload on the absalg of an
+earlier git revision, the first commit by default, and "after" on the
+working tree. Each runs in its own process, and reports how many distinct
+GroupElems the products are and how much its resident set grew while
+computing them.
+
+Run from the root of the repository, on Linux:
+
+    $ python bench/memory_bench.py [revision]
+"""
+
+import gc
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+def rss():
+    """Returns the resident set size of this process, in bytes"""
+    with open("/proc/self/statm") as f:
+        pages = int(f.read().split()[1])
+    return pages * os.sysconf("SC_PAGE_SIZE")
+
+def measure(root):
+    """Runs the workload on the absalg in root, and prints its footprint"""
+    sys.path.insert(0, root)
+    from absalg.Group import Sn
+
+    G = Sn(5)
+    elems = list(G)
+    gc.collect()
+    start = rss()
+    products = [g * h for g in elems for h in elems]
+    gc.collect()
+    print len(set(id(x) for x in products)), rss() - start
+
+def run(name, root):
+    """Measures the absalg in root in a new process, and prints a row"""
+    output = subprocess.check_output([sys.executable, __file__, \
+                                      "--measure", root])
+    wrappers, size = output.split()
+    print "%-8s %12s %12s" % (name, wrappers, size)
+
+def main():
+    if len(sys.argv) == 3 and sys.argv[1] == "--measure":
+        return measure(sys.argv[2])
+
+    if len(sys.argv) > 1:
+        revision = sys.argv[1]
+    else:
+        revision = subprocess.check_output(["git", "rev-list", \
+                                            "--max-parents=0", "HEAD"]).split()[0]
+    before = tempfile.mkdtemp()
+    try:
+        archive = subprocess.Popen(["git", "archive", revision, "absalg"], \
+                                   stdout=subprocess.PIPE)
+        subprocess.check_call(["tar", "-x", "-C", before], \
+                              stdin=archive.stdout)
+        if archive.wait() != 0:
+            raise RuntimeError("git archive %s failed" % revision)
+
+        print "Sn(5): %d products; before is %s" % (120 ** 2, revision[:12])
+        print "%-8s %12s %12s" % ("", "wrappers", "RSS bytes")
+        run("before", before)
+        run("after", os.path.abspath("."))
+    finally:
+        shutil.rmtree(before)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import unittest
+from absalg.Set import Set
+from absalg.Group import *
+from absalg.BitSet import *
+
+class test_bitset(unittest.TestCase):
+    def test_operations(self):
+        G = Zn(100)
+        table = G.tabulate().table
+        evens = bitset(table, range(0, 100, 2))
+        threes = G.bitset(GroupElem(i, G) for i in range(0, 100, 3))
+        self.assertEquals(len(evens), 50)
+        self.assertEquals(len(threes), 34)
+        self.assertEquals((evens & threes).to_set(), Set(range(0, 100, 6)))
+        self.assertEquals(len(evens | threes), 67)
+        self.assertEquals(Set(evens - threes), Set(range(0, 100, 2)) - \
+                          Set(range(0, 100, 3)))
+        self.assertEquals(len(evens ^ threes), 67 - 17)
+        self.assertTrue(evens & threes <= evens)
+        self.assertTrue(evens & threes < threes)
+        self.assertTrue(evens >= evens & threes)
+        self.assertFalse(evens <= threes)
+        self.assertFalse(evens < evens)
+        self.assertTrue(4 in evens)
+        self.assertFalse(3 in evens)
+        self.assertFalse("x" in evens)
+        self.assertFalse(BitSet(table))
+        self.assertEquals(evens, bitset(table, evens.to_set()))
+        self.assertEquals(BitSet.from_indices(table, [0, 2, 4]), \
+                          bitset(table, [0, 2, 4]))
+        self.assertEquals(BitSet.from_indices(table, evens.indices()), evens)
+        self.assertEquals(hash(evens), hash(bitset(table, range(0, 100, 2))))
+        self.assertNotEquals(evens, threes)
+        self.assertEquals(len(set([evens, threes, evens & evens])), 2)
+
+        # BitSets of different tables don't mix
+        other = bitset(Zn(100).tabulate().table, range(0, 100, 2))
+        self.assertNotEquals(evens, other)
+        with self.assertRaises(TypeError):
+            evens | other
+        with self.assertRaises(TypeError):
+            evens <= Set(range(100))
+        with self.assertRaises(ValueError):
+            bitset(table, [100])
+        with self.assertRaises(ValueError):
+            BitSet(table, 1 << 100)
+
+    def test_lattice(self):
+        G = Sn(4)
+        L = G.subgroup_lattice()
+        for H, subset in zip(L.subgroups, L.subsets):
+            self.assertEquals(subset.to_set(), H.Set)
+            self.assertEquals(subset, G.bitset(H))
+
+if __name__ == "__main__":
+    unittest.main()
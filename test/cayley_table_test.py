@@ -0,0 +1,40 @@
+import unittest
+from absalg.CayleyTable import *
+
+class test_cayley_table(unittest.TestCase):
+    def test_basics(self):
+        for n in range(1, 10):
+            t = cayley_table(range(n), lambda x: (x[0] + x[1]) % n)
+            self.assertEquals(len(t), n)
+            self.assertEquals(len(t.data), n * n)
+            for i in range(n):
+                self.assertEquals(list(t.row(i)), [(i + j) % n for j in range(n)])
+                for j in range(n):
+                    self.assertEquals(t.mul(i, j), (i + j) % n)
+                    self.assertEquals(t((i, j)), (i + j) % n)
+
+    def test_elements(self):
+        t = cayley_table(["a", "b"], lambda x: "a" if x[0] == x[1] else "b")
+        self.assertEquals(t.index, {"a": 0, "b": 1})
+        self.assertEquals(t(("b", "b")), "a")
+        self.assertEquals(t.mul(0, 1), 1)
+
+        with self.assertRaises(ValueError):
+            cayley_table(range(3), lambda x: x[0] + x[1])
+        with self.assertRaises(ValueError):
+            CayleyTable([0, 0], t.data)
+        with self.assertRaises(ValueError):
+            CayleyTable([0, 1, 2], t.data)
+
+    def test_renumber(self):
+        T = cayley_table(range(7), lambda x: (x[0] + x[1]) % 7)
+        order = [3, 1, 4, 0, 6, 5, 2]
+        R = T.renumber(order)
+        self.assertEquals(R.elems, order)
+        for a in range(7):
+            for b in range(7):
+                self.assertEquals(R.elems[R.mul(R.index[a], R.index[b])], \
+                                  (a + b) % 7)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+from absalg.Group import *
+from absalg.CosetEnumeration import *
+
+class test_coset_enumeration(unittest.TestCase):
+    def test_orders(self):
+        for gens, relators, order in [ \
+                ("a", ["a"], 1), \
+                ("a", ["aaaaaaa"], 7), \
+                ("ab", ["aa", "bb", "abAB"], 4), \
+                ("rs", ["rrrrr", "ss", "rsrs"], 10), \
+                ("ij", ["iiii", "iiJJ", "Jiji"], 8), \
+                ("ab", ["aa", "bbb", "ababababab"], 60), \
+                ("ab", ["aa", "bbb", "abababab"], 24)]:
+            C = CosetEnumeration(gens, relators)
+            self.assertEquals(len(C), order)
+            self.assertEquals(C.stats["index"], order)
+            self.assertTrue(C.stats["defined"] >= order)
+            self.assertTrue(C.stats["max_live"] >= order)
+            G = PresentedGroup(gens, relators)
+            self.assertEquals(len(G), order)
+            self.assertEquals(G.e.elem, "e")
+            Group(G.Set, G.bin_op)
+
+    def test_subgroup(self):
+        C = CosetEnumeration("ab", ["aa", "bbb", "ababababab"], subgroup=["a"])
+        self.assertEquals(len(C), 30)
+        C = CosetEnumeration("ab", ["aa", "bbb", "ababababab"], subgroup=["b"])
+        self.assertEquals(len(C), 20)
+        self.assertEquals(C.coset(""), 0)
+        self.assertEquals(C.coset("bbbB"), 0)
+        with self.assertRaises(ValueError):
+            C.cayley_table()
+
+    def test_table(self):
+        C = CosetEnumeration("rs", ["rrrr", "ss", "rsrs"])
+        for c, w in enumerate(C.words):
+            self.assertEquals(C.coset(w), c)
+            for x in range(4):
+                self.assertEquals(C.table[C.table[c][x]][x ^ 1], c)
+        G = PresentedGroup("rs", ["rrrr", "ss", "rsrs"])
+        self.assertTrue(G.is_isomorphic(Dn(4)))
+        self.assertFalse(G.is_isomorphic(PresentedGroup("ij", ["iiii", "iiJJ", "Jiji"])))
+        r, s = GroupElem("r", G), GroupElem("s", G)
+        self.assertEquals(r.order(), 4)
+        self.assertEquals(r * s * r * s, G.e)
+
+    def test_limits(self):
+        with self.assertRaises(RuntimeError):
+            CosetEnumeration("ab", ["aa", "bbb", "ababababab"], max_cosets=20)
+        with self.assertRaises(RuntimeError):
+            PresentedGroup("ab", ["aa", "bbb", "ababababab"], max_time=-1)
+        with self.assertRaises(ValueError):
+            CosetEnumeration("ae", ["a"])
+        with self.assertRaises(ValueError):
+            CosetEnumeration("ab", ["c"])
+
+    def test_Dn(self):
+        for n in range(1, 8):
+            D = Dn(n)
+            self.assertEquals(len(D), 2 * n)
+            self.assertEquals(D.e.elem, "R0")
+            Group(D.Set, D.bin_op)
+            for a in range(n):
+                R = GroupElem("R%d" % a, D)
+                S = GroupElem("S%d" % a, D)
+                self.assertEquals(R * GroupElem("S0", D), S)
+                self.assertEquals(S * S, D.e)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+from absalg.Group import *
+from absalg.Cosets import *
+
+class test_cosets(unittest.TestCase):
+    def test_cosets(self):
+        G = Sn(4)
+        for H in G.subgroups():
+            for left in [True, False]:
+                C = G.cosets(H, left)
+                self.assertEquals(len(C) * len(H), len(G))
+                self.assertEquals(C.representatives[0], G.e)
+                self.assertEquals(C.coset(0), H.Set)
+                for g in G:
+                    i = C.project(g)
+                    rep = C.representatives[i]
+                    self.assertTrue(g.elem in C.coset(i))
+                    if left:
+                        self.assertTrue((G.inverse(rep) * g).elem in H.Set)
+                    else:
+                        self.assertTrue((g * G.inverse(rep)).elem in H.Set)
+            self.assertEquals(len(G.left_transversal(H)), len(G) // len(H))
+            self.assertEquals(len(G.right_transversal(H)), len(G) // len(H))
+
+        with self.assertRaises(ValueError):
+            Cosets(Sn(3), Zn(2))
+
+    def test_quotient(self):
+        G = Sn(4)
+        for H in G.subgroups():
+            if not H.is_normal_subgroup(G): continue
+            Q = G / H
+            C = G.cosets(H)
+            self.assertEquals(len(Q), len(G) // len(H))
+            self.assertEquals(Q.e.elem, H.Set)
+            Group(Q.Set, Q.bin_op)
+            for g in G:
+                for h in G:
+                    self.assertEquals(Q.table.mul(C.project(g), C.project(h)), \
+                                      C.project(g * h))
+        for N in G.subgroups():
+            if N.is_normal_subgroup(G):
+                p = G.quotient_map(N)
+                for g in G:
+                    self.assertTrue(g.elem in p(g).elem)
+                self.assertEquals(p.kernel(), N)
+                self.assertEquals(p.image(), G / N)
+            elif len(N) > 1:
+                with self.assertRaises(ValueError):
+                    G.quotient_map(N)
+
+        V = G.normal_closure([(1, 0, 3, 2)])
+        self.assertTrue((G / V).is_isomorphic(Sn(3)))
+        self.assertTrue((Zn(12) / Zn(12).generate([4])).is_isomorphic(Zn(4)))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -64,5 +64,60 @@ class test_function(unittest.TestCase):
         for item in s:
             self.assertEquals(ID(item), item)
 
+    def test_tabulate(self):
+        s = Set(range(10))
+        f = Function(s, s, lambda x: (x + 3) % 10)
+        g = Function(s, s, lambda x: (2 * x) % 10)
+        self.assertFalse(f.is_tabulated())
+        self.assertTrue(f.tabulate() is f)
+        self.assertTrue(f.is_tabulated())
+        for x in s:
+            self.assertEquals(f(x), (x + 3) % 10)
+        with self.assertRaises(TypeError):
+            f(10)
+        with self.assertRaises(TypeError):
+            f([])
+
+        # Composing tabulated functions gives a tabulated function
+        self.assertFalse(f.compose(g).is_tabulated())
+        g.tabulate()
+        h = f
+        for k in range(50):
+            h = h.compose(f)
+        self.assertTrue(h.is_tabulated())
+        for x in s:
+            self.assertEquals(h(x), (x + 3 * 51) % 10)
+        self.assertEquals(f.compose(g), Function(s, s, lambda x: (2 * x + 3) % 10))
+        self.assertEquals(g.compose(f), Function(s, s, lambda x: (2 * x + 6) % 10))
+
+    def test_preimage(self):
+        s = Set(range(12))
+        t = Set(range(5))
+        f = Function(s, t, lambda x: x % 4)
+        for y in range(4):
+            self.assertEquals(f.preimage(y), Set(x for x in s if x % 4 == y))
+        self.assertEquals(f.preimage(4), Set())
+        with self.assertRaises(TypeError):
+            f.preimage(5)
+        self.assertEquals(f.image(), Set(range(4)))
+        self.assertFalse(f.is_surjective())
+        self.assertFalse(f.is_injective())
+        g = Function(t, t, lambda x: (x + 1) % 5)
+        self.assertTrue(g.is_bijective())
+        self.assertEquals(g.preimage(0), Set([4]))
+
+    def test_hash(self):
+        s = Set(range(3))
+        f = Function(s * s, s, lambda x: (x[0] + x[1]) % 3)
+        g = Function(s * s, s, lambda x: (x[1] + x[0]) % 3)
+        self.assertEquals(f, g)
+        self.assertEquals(hash(f), hash(g))
+
+        # Hashing a binary operation doesn't build the pairs of its domain
+        G = Set(range(400))
+        op = Function(CartesianProduct(G, G), G, lambda x: x[0], check=False)
+        hash(op)
+        self.assertTrue(op.domain._hash is None)
+
 if __name__ == "__main__":
     unittest.main()
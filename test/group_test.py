@@ -1,6 +1,12 @@
+import gc
+import pickle
 import unittest
+import weakref
 from math import factorial
+from fractions import gcd
 from absalg.Group import *
+from absalg.Set import Set
+from absalg.Function import Function
 
 class test_group(unittest.TestCase):
     def test_Zn(self):
@@ -15,8 +21,7 @@ class test_group(unittest.TestCase):
             self.assertTrue(Z <= Z)
             self.assertTrue(Z.is_normal_subgroup(Z))
             self.assertEquals(len(Z/Z), 1)
-            if n <= 5: # takes a while
-                self.assertEquals(len(Z * Z), n * n)
+            self.assertEquals(len(Z * Z), n * n)
             self.assertEquals(Z.generate(Z), Z)
 
     def test_Sn(self):
@@ -40,6 +45,59 @@ class test_group(unittest.TestCase):
                 self.assertEquals(len(S * S), factorial(n)**2)
             self.assertEquals(S.generate(S), S)
 
+    def test_hash_bin_op(self):
+        G = Sn(5)
+        self.assertEquals(hash(G.bin_op), hash(G.bin_op))
+        self.assertTrue(G.bin_op.domain._hash is None)
+
+    def test_pickle(self):
+        G = PresentedGroup("ab", ["aaaa", "bb", "abab"])
+        G.conjugacy_classes()
+        G.center()
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            g = G.generators()[0]
+            g.order()
+            h = pickle.loads(pickle.dumps(g, protocol))
+            H = h.group
+            self.assertEquals(h.elem, g.elem)
+            self.assertEquals(H.Set, G.Set)
+            self.assertEquals(h._order, 4)
+            self.assertTrue(GroupElem(h.elem, H) is h)
+            self.assertTrue(h * H.e is h)
+            self.assertEquals(H.conjugacy_classes(), G.conjugacy_classes())
+            self.assertTrue(H.is_isomorphic(G))
+            K = pickle.loads(pickle.dumps(G, protocol))
+            self.assertTrue(all(x.group is K for x in K))
+            self.assertEquals(K.center(), G.center())
+
+    def test_direct_product(self):
+        Z2 = Zn(2)
+        V = Z2 * Z2 * Z2 * Z2
+        self.assertEquals(len(V), 16)
+        self.assertEquals(V.e.elem, (0, 0, 0, 0))
+        self.assertTrue(GroupElem((1, 0, 1, 1), V) in V)
+        self.assertEquals(V, DirectProduct(Z2, Z2, Z2, Z2))
+        self.assertEquals(V, (Z2 * Z2) * (Z2 * Z2))
+        self.assertEquals(V.order_statistics(), {1: 1, 2: 15})
+        self.assertEquals(len(V.generators()), 4)
+        Group(V.Set, V.bin_op)
+
+        for P in [DirectProduct(Sn(3), Zn(4)), Dn(3) * Zn(2) * Sn(3), \
+                  DirectProduct(Zn(1), Zn(1)), DirectProduct(Zn(5))]:
+            self.assertEquals(P.generate(P.generators()), P)
+            Q = Group(P.Set, P.bin_op)
+            self.assertEquals(P.is_abelian(), Q.is_abelian())
+            self.assertEquals(P.e, Q.e)
+            for g in P:
+                self.assertEquals(P.inverse(g), Q.inverse(GroupElem(g.elem, Q)))
+
+        P = DirectProduct(Sn(3), Zn(4))
+        a = GroupElem(((1, 0, 2), 3), P)
+        self.assertEquals((a * a).elem, ((0, 1, 2), 2))
+        self.assertFalse(P.is_abelian())
+        with self.assertRaises(TypeError):
+            DirectProduct(Zn(2), 3)
+
     def test_subgroups(self):
         G = Zn(9)
         sgs = G.subgroups()
@@ -62,6 +120,53 @@ class test_group(unittest.TestCase):
             if H.is_normal_subgroup(G):
                 self.assertEquals(len(G / H) * len(H), len(G))
 
+    def test_normal(self):
+        G = Sn(4)
+        sgs = G.subgroups()
+        self.assertEquals(sum(1 for H in sgs if H.is_normal_subgroup(G)), 4)
+        for H in sgs:
+            self.assertTrue(H <= G)
+            self.assertEquals(H.is_normal_subgroup(G), \
+                              all(Set(g * h for h in H) == Set(h * g for h in H) \
+                                  for g in G))
+            self.assertTrue(H._normal_in[id(G)][0] is G)
+            N = G.normal_closure(H)
+            self.assertTrue(H <= N)
+            self.assertTrue(N.is_normal_subgroup(G))
+            self.assertTrue(all(N <= K for K in sgs if K.is_normal_subgroup(G) \
+                                and H <= K))
+        self.assertFalse(Zn(3) <= Zn(4))
+        self.assertFalse(Sn(3) <= Sn(4))
+
+        self.assertEquals(len(G.normal_closure([(1, 0, 2, 3)])), 24)
+        self.assertEquals(len(G.normal_closure([(1, 0, 3, 2)])), 4)
+        self.assertEquals(len(G.normal_closure([(1, 2, 0, 3)])), 12)
+        self.assertEquals(len(G.normal_closure([G.e])), 1)
+        self.assertEquals(len(Dn(6).normal_closure(["S0"])), 6)
+        with self.assertRaises(ValueError):
+            G.normal_closure([Zn(2).e])
+
+        # The normal closure is generated by every conjugate
+        for K in [Sn(4), Dn(8), Zn(3) * Sn(3)]:
+            for g in K:
+                N = K.normal_closure([g])
+                self.assertEquals(N, K.generate([K.inverse(x) * g * x \
+                                                 for x in K]))
+                self.assertTrue(N._normal_in[id(K)][1])
+        self.assertEquals(len(G.normal_closure([])), 1)
+
+        # Testing subgroups doesn't keep them alive in the group
+        G = Sn(4)
+        refs = []
+        for S in G.iter_subgroups():
+            S.is_normal_subgroup(G)
+            refs.append(weakref.ref(S))
+        S = None
+        gc.collect()
+        self.assertEquals(G._normal_in, {})
+        self.assertEquals(len(refs), 30)
+        self.assertTrue(all(r() is None for r in refs))
+
     def test_group_elem(self):
         V = Zn(2) * Zn(2)
         e, a, b, c = tuple(g for g in V)
@@ -108,6 +213,28 @@ class test_group(unittest.TestCase):
                     self.assertEquals(h * g, GroupElem(h.elem, G) * g)
                     self.assertEquals(g * h, g * GroupElem(h.elem, G))
 
+    def test_interning(self):
+        for G in [Zn(6), Sn(3), Sn(3).tabulate()]:
+            self.assertTrue(G.e is GroupElem(G.e.elem, G))
+            for g in G:
+                self.assertTrue(GroupElem(g.elem, G) is g)
+                self.assertFalse(hasattr(g, "__dict__"))
+                for h in G:
+                    self.assertTrue(g * h is GroupElem((g * h).elem, G))
+                    self.assertEquals(g == h, g is h)
+        self.assertEquals(GroupElem(1, Zn(3)), GroupElem(1, Zn(4)))
+        self.assertNotEquals(GroupElem(1, Zn(3)), GroupElem(2, Zn(3)))
+
+    def test_words(self):
+        for G in [Zn(1), Zn(12), Sn(4), Dn(5), Zn(2) * Zn(3), Sn(3).tabulate()]:
+            for elems in [[G.e], G.generators(), list(G)[:3]]:
+                words = G.words(elems)
+                self.assertEquals(Set(words), G.generate(elems).group_elems)
+                for g, w in words.iteritems():
+                    self.assertEquals(reduce(lambda x, i: x * elems[i], w, G.e), g)
+        self.assertEquals(Zn(12).words([3])[GroupElem(9, Zn(12))], (0, 0, 0))
+        self.assertEquals(Zn(12).words([3, 1])[GroupElem(5, Zn(12))], (0, 1, 1))
+
     def test_generators(self):
         for G in [Zn(1), Zn(2), Zn(5), Zn(8), Sn(1), Sn(2), Sn(3), \
                   Dn(1), Dn(2), Dn(3), Dn(4)]:
@@ -133,10 +260,338 @@ class test_group(unittest.TestCase):
             self.assertEquals(f.kernel(), G.generate([G.e]))
             self.assertEquals(f.image(), G)
 
+        self.assertTrue(Dn(6).is_isomorphic(Sn(3) * Zn(2)))
+        self.assertTrue((Zn(2) * Zn(3)).is_isomorphic(Zn(6)))
+        self.assertFalse(Dn(4).is_isomorphic(Zn(4) * Zn(2)))
         self.assertTrue(Zn(1).is_isomorphic(Sn(1)))
         self.assertTrue(Zn(2).is_isomorphic(Sn(2)))
         self.assertTrue(Zn(2).is_isomorphic(Dn(1)))
 
+    def test_inverses(self):
+        for G in [Zn(1), Zn(7), Sn(4), Dn(5), Zn(2) * Zn(4), Sn(3).tabulate()]:
+            self.assertEquals(G.inverses(G), [G.inverse(g) for g in G])
+            for g in G:
+                self.assertEquals(g * G.inverse(g), G.e)
+                self.assertEquals(G.inverse(g) * g, G.e)
+        with self.assertRaises(TypeError):
+            Zn(3).inverses([GroupElem(4, Zn(5))])
+
+    def test_axioms(self):
+        G = Set(range(4))
+        for full_check in [False, True]:
+            for n in range(1, 5):
+                H = Set(range(n))
+                Group(H, Function(H * H, H, lambda x: (x[0] + x[1]) % n), \
+                      full_check=full_check)
+            with self.assertRaises(ValueError):
+                Group(G, Function(G * G, G, lambda x: (x[0] - x[1]) % 4), \
+                      full_check=full_check)
+            with self.assertRaises(ValueError):
+                Group(G, Function(G * G, G, lambda x: max(x)), \
+                      full_check=full_check)
+            with self.assertRaises(ValueError):
+                Group(G, Function(G * G, G, lambda x: x[0] * x[1] % 4), \
+                      full_check=full_check)
+            with self.assertRaises(ValueError):
+                Group(Set(), Function(Set(), Set(), lambda x: x), \
+                      full_check=full_check)
+
+        # Non-associative, but associative on every triple with a middle
+        # element of 0, 1 or 2
+        def op(x):
+            a, b = x
+            if (a, b) == (3, 3): return 1
+            return (a + b) % 4
+        with self.assertRaises(ValueError):
+            Group(G, Function(G * G, G, op))
+
+        self.assertTrue(len(Sn(4).generators()) <= 5)
+
+    def test_parallel(self):
+        G = Set(range(4))
+        for full_check in [False, True]:
+            for n in [1, 5, 12]:
+                H = Set(range(n))
+                Z = Group(H, Function(H * H, H, lambda x: (x[0] + x[1]) % n), \
+                          full_check=full_check, workers=2, chunksize=3)
+                self.assertTrue(Z.table is not None)
+                self.assertEquals(Z.e.elem, 0)
+                self.assertEquals(Z, Zn(n))
+            for op in [lambda x: (x[0] - x[1]) % 4, max, \
+                       lambda x: x[0] * x[1] % 4]:
+                with self.assertRaises(ValueError):
+                    Group(G, Function(G * G, G, op), full_check=full_check, \
+                          workers=2)
+            with self.assertRaises(ValueError):
+                Group(Set(), Function(Set(), Set(), lambda x: x), workers=2)
+
+        S4 = Sn(4)
+        S = Group(S4.Set, S4.bin_op, workers=2)
+        self.assertEquals(S.conjugacy_classes(), S4.conjugacy_classes())
+
+        Z12, Z4 = Zn(12), Zn(4)
+        f = GroupHomomorphism(Z12, Z4, lambda x: GroupElem(x.elem % 4, Z4), \
+                              workers=2, chunksize=1)
+        self.assertTrue(f.is_tabulated())
+        self.assertEquals(len(f.kernel()), 3)
+        with self.assertRaises(ValueError):
+            GroupHomomorphism(Z12, Z4, lambda x: GroupElem(x.elem % 3, Z4), \
+                              workers=2)
+
+    def test_trusted(self):
+        G = Set(range(4))
+        bin_op = Function(G * G, G, lambda x: (x[0] + x[1]) % 4)
+        Z = Group(G, bin_op, trusted=True)
+        self.assertEquals(Z._e, None)
+        self.assertEquals(Z._abelian, None)
+        self.assertEquals(Z._group_elems, None)
+        self.assertEquals(Z.e, GroupElem(0, Z))
+        self.assertTrue(Z.is_abelian())
+        self.assertEquals(Z, Group(G, bin_op))
+        self.assertEquals(len(Z.group_elems), 4)
+
+        # Nothing is checked
+        Group(G, Function(G * G, G, lambda x: max(x)), trusted=True)
+        f = Function(G * G, G, lambda x: 7, check=False)
+        self.assertEquals(f((1, 2)), 7)
+
+    def test_tabulate(self):
+        for G in [Zn(1), Zn(6), Sn(3), Dn(4), Zn(2) * Zn(2)]:
+            T = G.tabulate()
+            self.assertTrue(T is G)
+            self.assertTrue(T.tabulate().table is T.table)
+            self.assertEquals(T.table.elems[0], T.e.elem)
+            self.assertEquals(list(T)[0], T.e)
+            str(T)
+
+        for n in range(1, 4):
+            G, T = Sn(n), Sn(n).tabulate()
+            self.assertEquals(str(G), str(T))
+            self.assertEquals(G.subgroups(), T.subgroups())
+            for g in T:
+                self.assertEquals(T.inverse(g) * g, T.e)
+                self.assertEquals(T.generate([g]), G.generate([g.elem]))
+                for h in T:
+                    self.assertEquals(g * h, GroupElem(g.elem, G) * \
+                                             GroupElem(h.elem, G))
+
+    def test_orders(self):
+        for n in range(1, 13):
+            Z = Zn(n)
+            for g in Z:
+                self.assertEquals(g.order(), n // gcd(g.elem, n))
+            self.assertEquals(sum(Z.order_statistics().values()), n)
+            self.assertEquals(Z.element_orders(), dict((g, g.order()) for g in Z))
+
+        self.assertEquals(Sn(4).order_statistics(), {1: 1, 2: 9, 3: 8, 4: 6})
+        self.assertEquals(Dn(4).tabulate().order_statistics(), {1: 1, 2: 5, 4: 2})
+        self.assertEquals((Zn(2) * Zn(2)).order_statistics(), {1: 1, 2: 3})
+        for G in [Sn(3), Dn(6)]:
+            for g in G:
+                self.assertEquals(g.order(), len(G.generate([g])))
+
+    def test_fingerprint(self):
+        self.assertEquals(Sn(3).fingerprint(), Dn(3).fingerprint())
+        self.assertNotEquals(Zn(4).fingerprint(), (Zn(2) * Zn(2)).fingerprint())
+        self.assertNotEquals(Dn(4).fingerprint(), Zn(8).fingerprint())
+        self.assertEquals(Dn(4).fingerprint(), (8, False, ((1, 1), (2, 5), (4, 2)), \
+                          2, ((1, 1), (2, 1), (2, 2), (2, 2), (4, 2))))
+        self.assertEquals(Sn(4).fingerprint()[3], 1)
+        self.assertEquals(Zn(6).fingerprint()[3], 6)
+
+        groups = [Zn(4), Zn(2) * Zn(2), Dn(2), Zn(6), Sn(3), Dn(3), \
+                  Zn(2) * Zn(3), Zn(8), Dn(4)]
+        classes = isomorphism_classes(groups)
+        self.assertEquals(sorted(len(c) for c in classes), [1, 1, 1, 2, 2, 2])
+        for c in classes:
+            for G in c:
+                self.assertTrue(G.is_isomorphic(c[0]))
+
+    def test_isomorphisms(self):
+        for G, count in [(Zn(1), 1), (Zn(12), 4), (Zn(2) * Zn(2), 6), \
+                         (Sn(3), 6), (Dn(4), 8), (Sn(4), 24), \
+                         (Zn(2) * Zn(4), 8)]:
+            for workers in [None, 2]:
+                autos = list(G.automorphisms(workers=workers, chunksize=3))
+                self.assertEquals(len(autos), count)
+                self.assertEquals(len(set(tuple(sorted(f._table.items())) \
+                                      for f in autos)), count)
+                for f in autos[:3]:
+                    GroupHomomorphism(G, G, f.function)
+                    self.assertTrue(f.is_isomorphism())
+
+        self.assertEquals(len(list(Sn(3).all_isomorphisms(Dn(3)))), 6)
+        self.assertEquals(list(Zn(6).all_isomorphisms(Sn(3))), [])
+        with self.assertRaises(TypeError):
+            Zn(3).all_isomorphisms(Set(range(3)))
+        with self.assertRaises(TypeError):
+            Zn(3).find_isomorphism(Set(range(3)))
+
+        f = Sn(4).find_isomorphism(Sn(4), workers=2, chunksize=1)
+        GroupHomomorphism(Sn(4), Sn(4), f.function)
+        self.assertEquals(Zn(8).find_isomorphism(Dn(4), workers=2), None)
+        self.assertEquals((Zn(2) * Zn(4)).find_isomorphism(Dn(4), workers=2), \
+                          None)
+
+    def test_powers(self):
+        ks = [0, 1, 2, 3, 7, 8, 100, 10 ** 6, 2 ** 70 + 1, -1, -2, -9, -10 ** 6]
+        for G in [Zn(1), Zn(12), Sn(4), Dn(5)]:
+            for g in G:
+                naive = [G.e]
+                for i in range(len(G)):
+                    naive.append(naive[-1] * g)
+                k = len(naive) - 1
+                def expected(n):
+                    return naive[n % k]
+                # Before and after the order of g is known
+                self.assertEquals([g ** n for n in ks], map(expected, ks))
+                self.assertEquals(g.powers(ks), map(expected, ks))
+                g.order()
+                self.assertEquals([g ** n for n in ks], map(expected, ks))
+                self.assertEquals(g.powers(ks), map(expected, ks))
+            self.assertEquals(G.powers(G, -5), [g ** -5 for g in G])
+            G.tabulate()
+            for n in [12345, 2 ** 70, -(2 ** 63), -(2 ** 70) - 1]:
+                self.assertEquals(G.powers(G, n), [g ** n for g in G])
+            self.assertEquals(G.e.powers([]), [])
+
+        g = GroupElem((1, 2, 0), Sn(3))
+        with self.assertRaises(TypeError):
+            g ** 1.5
+        with self.assertRaises(TypeError):
+            g.powers([1, "2"])
+        with self.assertRaises(TypeError):
+            Zn(3).powers([g], 2)
+        with self.assertRaises(TypeError):
+            g.group.powers([g], 2.0)
+
+    def test_index_operations(self):
+        for G in [Zn(1), Zn(7), Sn(4), Dn(5), Zn(2) * Sn(3)]:
+            elems = list(G) * 3
+            a = G.indices(elems)
+            b = G.indices(list(reversed(elems)))
+            self.assertEquals(G.elements(a), elems)
+            self.assertEquals(G.elements(G.index_products(a, b)), \
+                              [x * y for x, y in zip(elems, reversed(elems))])
+            self.assertEquals(G.elements(G.index_inverses(a)), \
+                              G.inverses(elems))
+            self.assertEquals(G.elements(G.index_conjugates(a, b)), \
+                              [G.inverse(y) * x * y for x, y \
+                               in zip(elems, reversed(elems))])
+            table = G.index_table(a[:5], b)
+            self.assertEquals(len(table), min(5, len(a)))
+            for i, row in zip(a, table):
+                self.assertEquals(list(row), list(G.index_products( \
+                                  [i] * len(b), b)))
+            for k in [0, 1, 2, 5, -1, -7, 10 ** 6, 2 ** 70, -(2 ** 63), \
+                      -(2 ** 63) - 1]:
+                self.assertEquals(G.elements(G.index_powers(a, k)), \
+                                  [x ** k for x in elems])
+            ks = range(-len(a), len(a), 2)
+            self.assertEquals(G.elements(G.index_powers(a, ks)), \
+                              [x ** k for x, k in zip(elems, ks)])
+            self.assertEquals(len(G.index_products([], [])), 0)
+            self.assertEquals(G._exponent, None)
+
+        self.assertEquals(Sn(4).exponent(), 12)
+        self.assertEquals(Zn(7).exponent(), 7)
+        self.assertEquals((Zn(2) * Zn(4)).exponent(), 4)
+
+        G = Zn(5)
+        with self.assertRaises(TypeError):
+            G.index_powers([1, 2], 1.5)
+        with self.assertRaises(TypeError):
+            G.index_powers([1, 2], [1, 1.5])
+        with self.assertRaises(TypeError):
+            G.index_inverses([1.0, 2.7])
+        with self.assertRaises(TypeError):
+            G.index_products([0, 1], [True, 0.5])
+        with self.assertRaises(ValueError):
+            G.index_products([0, 1], [0])
+        with self.assertRaises(ValueError):
+            G.index_inverses([5])
+        with self.assertRaises(ValueError):
+            G.index_inverses([-1])
+        with self.assertRaises(ValueError):
+            G.index_powers([1, 2], [1])
+        with self.assertRaises(TypeError):
+            G.indices([1])
+        with self.assertRaises(TypeError):
+            G.indices([GroupElem(0, Zn(6)), GroupElem(5, Zn(6))])
+
+    @unittest.skipIf(numpy is None, "NumPy isn't installed")
+    def test_index_operations_numpy(self):
+        G = Sn(4)
+        a = G.indices(list(G))
+        ks = [0, 5, -7, 2 ** 70, -(2 ** 63), 2 ** 63 - 1]
+        for k in ks:
+            result = G.index_powers(a, k)
+            self.assertTrue(isinstance(result, numpy.ndarray))
+            self.assertEquals(G.elements(result), [x ** k for x in G])
+        k = numpy.array([-(2 ** 63), 2 ** 63 - 1] * 12, numpy.int64)
+        self.assertEquals(G.elements(G.index_powers(a, k)), \
+                          [x ** int(e) for x, e in zip(G, k)])
+        big = [2 ** 70 + i for i in range(24)]
+        self.assertEquals(G.elements(G.index_powers(a, big)), \
+                          [x ** e for x, e in zip(G, big)])
+        b = list(reversed(a))
+        self.assertTrue(isinstance(G.index_products(a, b), numpy.ndarray))
+        self.assertEquals(G.index_table(a, b).shape, (24, 24))
+        with self.assertRaises(TypeError):
+            G.index_inverses(numpy.array([1.0, 2.7]))
+        with self.assertRaises(TypeError):
+            G.index_products(a, numpy.array(b, numpy.float32))
+        with self.assertRaises(TypeError):
+            G.index_powers(a, numpy.ones(24) * 1.5)
+        self.assertEquals(len(G.index_inverses(numpy.array([]))), 0)
+
+    def test_conjugacy_classes(self):
+        for G, sizes in [(Zn(5), [1] * 5), (Sn(3), [1, 2, 3]), \
+                         (Sn(4), [1, 3, 6, 6, 8]), (Dn(4), [1, 1, 2, 2, 2]), \
+                         (Dn(5), [1, 2, 2, 5])]:
+            classes = G.conjugacy_classes()
+            self.assertEquals(sorted(len(c) for c in classes), sizes)
+            self.assertEquals(classes[0], Set([G.e]))
+            self.assertEquals(sum(len(c) for c in classes), len(G))
+            reps = G.class_representatives()
+            for c, g, order in zip(classes, reps, G.centralizer_orders()):
+                self.assertTrue(g in c)
+                self.assertEquals(G.conjugacy_class(g), c)
+                self.assertEquals(c, Set(G.inverse(h) * g * h for h in G))
+                self.assertEquals(len(G.centralizer(g)), order)
+                self.assertTrue(G.centralizer(g) <= G)
+            Z = G.center()
+            self.assertEquals(len(Z), sizes.count(1))
+            self.assertTrue(Z.is_normal_subgroup(G))
+            self.assertTrue(G.center() is Z)
+        self.assertEquals(Dn(4).center().Set, Set(["R0", "R2"]))
+
+    def test_homomorphisms(self):
+        Z12, Z4, S3 = Zn(12), Zn(4), Sn(3)
+        f = extend_homomorphism(Z12, Z4, {1: 1})
+        self.assertEquals(f, GroupHomomorphism(Z12, Z4, \
+                                               lambda x: GroupElem(x.elem % 4, Z4)))
+        self.assertEquals(len(f.kernel()), 3)
+        self.assertEquals(f.image(), Z4)
+        self.assertFalse(f.is_isomorphism())
+        for g in Z12:
+            self.assertEquals(f(g).elem, g.elem % 4)
+        with self.assertRaises(ValueError):
+            extend_homomorphism(Z4, Z12, {1: 1})
+        with self.assertRaises(ValueError):
+            extend_homomorphism(Z12, Z4, {2: 1})
+        with self.assertRaises(TypeError):
+            f(GroupElem(1, S3 * S3))
+
+        # The sign of a permutation, and D6 -> S3
+        sign = extend_homomorphism(S3, Zn(2), {(1, 0, 2): 1, (1, 2, 0): 0})
+        self.assertEquals(len(sign.kernel()), 3)
+        self.assertTrue(sign.kernel().is_normal_subgroup(S3))
+        D = Dn(3)
+        f = extend_homomorphism(D, S3, {"R1": (1, 2, 0), "S0": (0, 2, 1)})
+        self.assertTrue(f.is_isomorphism())
+        GroupHomomorphism(D, S3, f.function)
+
     def test_cyclic(self):
         for n in range(1, 10):
             self.assertTrue(Zn(n).is_cyclic())
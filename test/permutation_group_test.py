@@ -0,0 +1,68 @@
+import unittest
+import random
+from math import factorial
+from absalg.Group import *
+from absalg.PermutationGroup import *
+
+class test_permutation_group(unittest.TestCase):
+    def test_order(self):
+        for n in range(1, 9):
+            self.assertEquals(Sym(n).order(), factorial(n))
+            self.assertEquals(len(Alt(n)), max(factorial(n) // 2, 1))
+        self.assertEquals(Sym(12).order(), factorial(12))
+
+        # D4, as symmetries of a square
+        D = PermutationGroup([(1, 2, 3, 0), (3, 2, 1, 0)])
+        self.assertEquals(D.order(), 8)
+        self.assertEquals(PermutationGroup([], 5).order(), 1)
+        self.assertEquals(PermutationGroup([(0, 1, 2)]).order(), 1)
+
+        with self.assertRaises(TypeError):
+            PermutationGroup([(0, 0, 1)])
+        with self.assertRaises(ValueError):
+            PermutationGroup([])
+
+    def test_membership(self):
+        A = Alt(6)
+        S = Sym(6)
+        for g in Sn(4):
+            p = g.elem + (4, 5)
+            self.assertTrue(p in S)
+            self.assertEquals(p in A, Sn(4).generate([g]) <= Sn(4).generate( \
+                [(1, 2, 0, 3), (0, 2, 3, 1)]))
+        self.assertFalse((0, 1, 2) in S)
+        self.assertFalse((0, 0, 1, 2, 3, 4) in S)
+
+        rng = random.Random(1)
+        G = PermutationGroup([(1, 0, 2, 3, 4, 5, 6, 7), (0, 1, 3, 2, 4, 5, 6, 7)])
+        for i in range(20):
+            g = G.random_element(rng)
+            self.assertTrue(g in G)
+            self.assertTrue(A.random_element(rng) in A)
+        self.assertEquals(len(set(G)), 4)
+
+    def test_stabilizers(self):
+        S = Sym(6)
+        chain = S.stabilizer_chain()
+        self.assertEquals(len(chain), len(S.base))
+        for i, (b, orbit, gens) in enumerate(chain):
+            self.assertTrue(b in orbit)
+            H = S.stabilizer(i)
+            self.assertEquals(H.order(), factorial(6 - i))
+            for g in gens:
+                self.assertTrue(all(g[c] == c for c in S.base[:i]))
+        for g in S.strong_generators():
+            self.assertTrue(g in S)
+
+    def test_to_group(self):
+        for n in range(1, 5):
+            self.assertEquals(Sym(n).to_group(), Sn(n))
+        G = Alt(4).to_group()
+        self.assertEquals(len(G), 12)
+        self.assertTrue(G <= Sn(4))
+        self.assertTrue(G.is_normal_subgroup(Sn(4)))
+        with self.assertRaises(ValueError):
+            Sym(8).to_group()
+
+if __name__ == "__main__":
+    unittest.main()
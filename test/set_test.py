@@ -20,5 +20,28 @@ class test_set(unittest.TestCase):
 
         self.assertEquals(Set(range(10)) * Set([]), Set([]))
 
+    def test_cartesian_product(self):
+        for n in range(5):
+            s = Set(range(n))
+            t = Set("abc")
+            p = CartesianProduct(s, t)
+            self.assertEquals(len(p), 3 * n)
+            self.assertEquals(p, s * t)
+            self.assertEquals(s * t, p)
+            self.assertEquals(Set(p), s * t)
+            self.assertEquals(hash(p), hash(s * t))
+            self.assertEquals(p, CartesianProduct(s, Set("cba")))
+            self.assertEquals(p == CartesianProduct(t, s), n == 0)
+            self.assertEquals(len(p * s), 3 * n * n)
+            for x in s:
+                self.assertTrue((x, "a") in p)
+                self.assertFalse(("a", x) in p)
+            self.assertFalse((0, "a", "b") in p)
+            self.assertFalse(0 in p)
+        self.assertEquals(CartesianProduct(Set(), Set("ab")), \
+                          CartesianProduct(Set("a"), Set()))
+        with self.assertRaises(TypeError):
+            CartesianProduct(Set(), [])
+
 if __name__ == "__main__":
     unittest.main()
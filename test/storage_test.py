@@ -0,0 +1,179 @@
+import os
+import pickle
+import struct
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import types
+import unittest
+from multiprocessing import Pool
+from array import array
+from absalg.Group import *
+from absalg.Storage import *
+from absalg.Storage import _MAGIC
+from absalg.Set import Set, CartesianProduct
+from absalg.Function import Function
+
+def _groups():
+    return [Zn(2) * Zn(4), Zn(4) * Zn(2), Dn(4), Zn(8), Sn(3) * Zn(1)]
+
+def _add(args):
+    """Adds one of _groups() to a catalog, from a worker process"""
+    directory, i = args
+    return sorted(Catalog(directory).add(_groups()[i]).Set)
+
+class test_storage(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_save_and_load(self):
+        path = os.path.join(self.directory, "G.group")
+        for G in [Zn(1), Zn(12), Sn(4), Dn(5), Zn(2) * Sn(3), \
+                  PresentedGroup("ab", ["aaa", "bb", "abab"]), Zn(300)]:
+            save_group(G, path)
+            H = load_group(path)
+            self.assertEquals(H.Set, G.Set)
+            self.assertEquals(H.e, G.e)
+            self.assertEquals(H.fingerprint(), G.fingerprint())
+            self.assertEquals(H.is_abelian(), G.is_abelian())
+            self.assertEquals(list(H.table.data), list(G.table.data))
+            for g in H:
+                x = GroupElem(g.elem, G)
+                self.assertEquals(g.order(), x.order())
+                self.assertEquals(H.inverse(g), G.inverse(x))
+            self.assertEquals(H.generate(H.generators()), H)
+            self.assertTrue(H.is_isomorphic(G))
+
+            # Saving a loaded group gives the same file
+            other = os.path.join(self.directory, "H.group")
+            save_group(H, other)
+            self.assertEquals(open(path, "rb").read(), open(other, "rb").read())
+
+        # Pickling a mapped table only pickles its path
+        table = load_table(path)
+        data = pickle.dumps(table, pickle.HIGHEST_PROTOCOL)
+        self.assertTrue(len(data) < 1000)
+        copy = pickle.loads(data)
+        self.assertEquals(copy.elems, table.elems)
+        self.assertEquals(list(copy.data), list(table.data))
+
+        # Groups of Sets are saved, but the header never runs code
+        G = Sn(4)
+        Q = G / G.normal_closure([GroupElem((1, 0, 3, 2), G)])
+        save_group(Q, path)
+        H = load_group(path)
+        self.assertEquals(H.Set, Q.Set)
+        self.assertTrue(all(type(x.elem) is Set for x in H))
+        self.assertTrue(H.is_isomorphic(Sn(3)))
+        with self.assertRaises(TypeError):
+            x = Set([object()])
+            save_group(Group(x, Function(CartesianProduct(x, x), x, \
+                                         lambda p: p[0])), path)
+        header = "__import__('os').system('false')"
+        with open(path, "wb") as f:
+            f.write(_MAGIC + struct.pack("<Q", len(header)) + header)
+        with self.assertRaises(ValueError):
+            load_group(path)
+
+        with open(path, "wb") as f:
+            f.write("not a group")
+        with self.assertRaises(ValueError):
+            load_group(path)
+        with self.assertRaises(TypeError):
+            save_group(Set([1]), path)
+
+    def test_catalog(self):
+        catalog = Catalog(os.path.join(self.directory, "catalog"))
+        G = catalog.get(Sn, 4)
+        self.assertTrue(isinstance(G.table.data, array))
+        H = catalog.get(Sn, 4)
+        self.assertFalse(isinstance(H.table.data, array))
+        self.assertEquals(H, G)
+        self.assertEquals(catalog.get(Dn, 4), Dn(4))
+        self.assertEquals(len(os.listdir(catalog.directory)), 2)
+
+        # Constructors are told apart by module as well as name, and ones
+        # without a unique name are rejected
+        module = types.ModuleType("other_groups")
+        exec "from absalg.Group import Zn\ndef Sn(n): return Zn(n)" \
+             in module.__dict__
+        sys.modules["other_groups"] = module
+        try:
+            self.assertEquals(catalog.get(module.Sn, 4), Zn(4))
+            self.assertEquals(len(catalog.get(Sn, 4)), 24)
+        finally:
+            del sys.modules["other_groups"]
+        def nested(n):
+            return Zn(n)
+        for constructor in [lambda n: Zn(n), nested]:
+            with self.assertRaises(TypeError):
+                catalog.get(constructor, 4)
+        self.assertEquals(len(os.listdir(catalog.directory)), 3)
+
+        # Group arguments are keyed by their contents, not their address
+        P = catalog.get(DirectProduct, Zn(2), Zn(3))
+        self.assertTrue(isinstance(P.table.data, array))
+        Q = catalog.get(DirectProduct, Zn(2), Zn(3))
+        self.assertFalse(isinstance(Q.table.data, array))
+        self.assertEquals(Q, Zn(2) * Zn(3))
+        self.assertEquals(catalog.get(DirectProduct, Zn(3), Zn(2)), \
+                          Zn(3) * Zn(2))
+        self.assertEquals(len(os.listdir(catalog.directory)), 5)
+
+        # Other arguments need a stable repr, or an explicit key
+        with self.assertRaises(TypeError):
+            catalog.get(Zn, object())
+        self.assertEquals(catalog.get(Zn, 5, key="five"), Zn(5))
+        self.assertFalse(isinstance(catalog.get(Zn, 5, key="five").table.data, \
+                                    array))
+        with self.assertRaises(TypeError):
+            catalog.get(Zn, 5, name="five")
+        self.assertEquals(len(os.listdir(catalog.directory)), 6)
+
+        self.assertTrue(catalog.add(Sn(3)) is not None)
+        S = catalog.add(Dn(3))
+        self.assertEquals(S.Set, Sn(3).Set)
+        self.assertEquals(len(catalog.matching(Sn(3).fingerprint())), 1)
+        catalog.add(Zn(6))
+        catalog.add(Zn(2) * Zn(3))
+        self.assertEquals(len(catalog.matching(Zn(6).fingerprint())), 1)
+        self.assertEquals(catalog.matching(Zn(5).fingerprint()), [])
+        self.assertEquals(len(os.listdir(catalog.directory)), 8)
+
+        # A slot claimed by another process is waited for, not overwritten
+        G = Zn(3) * Zn(3)
+        path = catalog._path("fingerprint", (G.fingerprint(), 0))
+        open(path, "wb").close()
+        def save():
+            time.sleep(0.1)
+            save_group(Zn(3) * Zn(3), path)
+        thread = threading.Thread(target=save)
+        thread.start()
+        try:
+            self.assertTrue(catalog.add(G) is not G)
+        finally:
+            thread.join()
+        self.assertEquals(len(catalog.matching(G.fingerprint())), 1)
+
+    def test_concurrent_add(self):
+        directory = os.path.join(self.directory, "catalog")
+        groups = _groups()
+        pool = Pool(4)
+        try:
+            elems = pool.map(_add, [(directory, i) for i \
+                                    in range(len(groups)) * 4])
+        finally:
+            pool.terminate()
+            pool.join()
+        catalog = Catalog(directory)
+        for i, e in zip(range(len(groups)) * 4, elems):
+            self.assertEquals(sorted(catalog.add(groups[i]).Set), e)
+        self.assertEquals(len(os.listdir(directory)), 4)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+import unittest
+from absalg.Group import *
+from absalg.SubgroupLattice import *
+
+class test_subgroup_lattice(unittest.TestCase):
+    def test_counts(self):
+        for G, count in [(Zn(1), 1), (Zn(12), 6), (Zn(2) * Zn(2), 5), \
+                         (Sn(3), 6), (Dn(4), 10), (Sn(4), 30), \
+                         (Zn(2) * Zn(2) * Zn(2), 16)]:
+            L = G.subgroup_lattice()
+            self.assertEquals(len(L), count)
+            self.assertEquals(len(list(G.iter_subgroups())), count)
+            self.assertEquals(Set(L), G.subgroups())
+
+    def test_lattice(self):
+        G = Sn(4)
+        L = SubgroupLattice(G)
+        self.assertEquals(len(L.subgroups[0]), 1)
+        self.assertEquals(L.subgroups[-1], G)
+        self.assertEquals(sum(L.normal), 4)
+        for i, H in enumerate(L):
+            self.assertTrue(H <= G)
+            self.assertEquals(L.index[i] * len(H), len(G))
+            self.assertEquals(L.normal[i], H.is_normal_subgroup(G))
+            self.assertTrue(L.contains(0, i))
+            self.assertTrue(L.contains(i, len(L) - 1))
+        for i, j in L.edges:
+            self.assertTrue(L.contains(i, j))
+            self.assertTrue(L.subgroups[i] <= L.subgroups[j])
+            self.assertFalse(L.contains(j, i))
+            self.assertTrue(i in L.maximal_subgroups(j))
+
+        # The maximal subgroups of S4 are A4, three D4s and four S3s
+        self.assertEquals(sorted(len(L.subgroups[i]) for i in \
+                                 L.maximal_subgroups(len(L) - 1)), \
+                          [6, 6, 6, 6, 8, 8, 8, 12])
+
+if __name__ == "__main__":
+    unittest.main()
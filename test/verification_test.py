@@ -0,0 +1,56 @@
+import unittest
+from absalg.CayleyTable import *
+from absalg.Verification import *
+from absalg.Verification import _pool_imap
+
+def cyclic_table(n):
+    return cayley_table(range(n), lambda x: (x[0] + x[1]) % n)
+
+def _sum_rows(tables, rows):
+    return tables + sum(rows)
+
+class test_verification(unittest.TestCase):
+    def test_associativity(self):
+        T = cyclic_table(6)
+        for workers in [None, 1, 3]:
+            self.assertEquals(associativity_counterexample(T, \
+                              workers=workers), None)
+            self.assertEquals(associativity_counterexample(T, [1], \
+                              workers=workers, chunksize=2), None)
+
+        # Subtraction mod 5 isn't associative, and every counterexample
+        # found is a real one
+        T = cayley_table(range(5), lambda x: (x[0] - x[1]) % 5)
+        for workers in [None, 2]:
+            for middle in [None, [1]]:
+                a, b, c = associativity_counterexample(T, middle, workers, 1)
+                self.assertNotEquals(T.mul(T.mul(a, b), c), \
+                                     T.mul(a, T.mul(b, c)))
+
+    def test_homomorphism(self):
+        Z12, Z4 = cyclic_table(12), cyclic_table(4)
+        for workers in [None, 2]:
+            self.assertEquals(homomorphism_counterexample(Z12, Z4, \
+                              [i % 4 for i in range(12)], workers, 5), None)
+            images = [i % 3 for i in range(12)]
+            a, b = homomorphism_counterexample(Z12, Z4, images, workers, 5)
+            self.assertNotEquals(images[Z12.mul(a, b)], \
+                                 Z4.mul(images[a], images[b]))
+
+    def test_pool_imap(self):
+        # Tasks are pulled a few at a time, and results come back in order
+        pulled = []
+        def tasks():
+            for i in xrange(100):
+                pulled.append(i)
+                yield [i]
+        results = _pool_imap(_sum_rows, 1, tasks(), 2)
+        self.assertEquals(next(results), 1)
+        self.assertTrue(len(pulled) <= 5)
+        self.assertEquals(list(results), range(2, 101))
+        results = _pool_imap(_sum_rows, 0, tasks(), 2)
+        next(results)
+        results.close()
+
+if __name__ == "__main__":
+    unittest.main()